@@ -0,0 +1,133 @@
+import os
+import json
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from graph_client import GraphClient
+from ledger import LedgerError, LedgerDeferred
+import metrics
+import scheduler
+
+DEFAULT_CAPTION = "Can you solve this? #math #reel #puzzle"
+# Instagram begrenzt API-Veröffentlichungen je Konto und 24 h; mit Reserve darunter bleiben
+MAX_POSTS_PER_DAY = int(os.environ.get("ACCOUNT_MAX_POSTS_PER_DAY", 25))
+DAY_SECONDS = 24 * 3600
+
+# === Kontenliste ===
+def load_accounts():
+    # INSTAGRAM_ACCOUNTS (JSON) oder ACCOUNTS_FILE (Pfad zu einer JSON-Datei):
+    # [{"name": "...", "user_id": "...", "access_token": "...", "caption": "...", "max_posts_per_day": 25}, ...]
+    raw = os.environ.get("INSTAGRAM_ACCOUNTS")
+    path = os.environ.get("ACCOUNTS_FILE")
+    if not raw and path:
+        with open(path, encoding="utf-8") as f:
+            raw = f.read()
+    if raw:
+        accounts = json.loads(raw)
+    elif os.environ.get("INSTAGRAM_USER_ID") and os.environ.get("ACCESS_TOKEN"):
+        # Bisherige Einzelkonto-Konfiguration
+        accounts = [{"name": "default", "user_id": os.environ["INSTAGRAM_USER_ID"], "access_token": os.environ["ACCESS_TOKEN"]}]
+    else:
+        accounts = []
+
+    names = set()
+    for account in accounts:
+        if not account.get("user_id") or not account.get("access_token"):
+            raise ValueError(f"Konto ohne user_id/access_token: {account.get('name')}")
+        account.setdefault("name", account["user_id"])
+        account.setdefault("caption", DEFAULT_CAPTION)
+        account.setdefault("max_posts_per_day", MAX_POSTS_PER_DAY)
+        if account["name"] in names:
+            raise ValueError(f"Kontoname doppelt: {account['name']}")
+        names.add(account["name"])
+    return accounts
+
+# === Ein Video, viele Konten ===
+class AccountRegistry:
+    def __init__(self, accounts, ledger, max_wait=180):
+        self.accounts = accounts
+        self.ledger = ledger
+        self.max_wait = max_wait
+        # Ein Client je Konto: eigene Session, eigene Auslastung und Sperrzeit aus den Rate-Limit-Headern,
+        # ein gebremstes Konto hält die anderen nicht auf
+        self.clients = {a["name"]: GraphClient(a["user_id"], a["access_token"]) for a in accounts}
+
+    def __len__(self):
+        return len(self.accounts)
+
+    def budget(self, account):
+        posted = self.ledger.published_since(account["name"], time.time() - DAY_SECONDS)
+        return account["max_posts_per_day"] - posted
+
+    def status(self):
+        return [{"name": a["name"], "budget_left": self.budget(a), "usage_percent": self.clients[a["name"]].usage}
+                for a in self.accounts]
+
+    def _post(self, job, account, target, publish_at):
+        name = account["name"]
+        client = self.clients[name]
+        stage = target["stage"] if target else "pending"
+        creation_id = target["creation_id"] if target else None
+        if stage == "published":
+            # "" = veröffentlicht, Media-ID unbekannt
+            return target["media_id"] or ""
+
+        # Übersprungene Konten bei jedem Versuch erneut gegen ihr Budget prüfen
+        if stage in ("pending", "skipped"):
+            if self.budget(account) <= 0:
+                print(f"[WARN] Konto {name}: Tagesbudget von {account['max_posts_per_day']} Posts erschöpft – übersprungen.")
+                self.ledger.advance_target(job["id"], name, "skipped", error="Tagesbudget erschöpft")
+                return None
+            with metrics.span("container_create"):
+                creation_id = client.create_container(job["video_url"], account["caption"])
+            self.ledger.advance_target(job["id"], name, "container", creation_id=creation_id)
+
+        with metrics.span("media_ready_wait"):
+            status = client.wait_for_status(creation_id, self.max_wait)
+        if status == "PUBLISHED":
+            # Wie beim Einzelkonto: veröffentlicht, aber nicht mehr protokolliert
+            print(f"[WARN] Konto {name}: Container {creation_id} ist bereits veröffentlicht.")
+            self.ledger.advance_target(job["id"], name, "published", creation_id=creation_id)
+            return ""
+        if status != "FINISHED":
+            if stage == "publishing":
+                raise LedgerError(f"Konto {name}: Media {creation_id} nach Publish-Versuch im Status {status}")
+            # Wie beim Einzelkonto: beim nächsten Versuch einen neuen Container anlegen
+            self.ledger.advance_target(job["id"], name, "pending", error=f"Media {creation_id} nicht bereit ({status})")
+            raise LedgerError(f"Konto {name}: Media {creation_id} nicht bereit ({status})")
+
+        scheduler.wait_for_slot(publish_at)
+        self.ledger.advance_target(job["id"], name, "publishing", creation_id=creation_id)
+        with metrics.span("publish"):
+            media_id = client.publish(creation_id)
+        self.ledger.advance_target(job["id"], name, "published", creation_id=creation_id, media_id=media_id)
+        print(f"[INFO] ✅ Reel auf {name} gepostet.")
+        return media_id
+
+    def fan_out(self, job, publish_at=None):
+        # Container und Publish laufen je Konto parallel; bereits veröffentlichte Konten
+        # werden bei einem fortgesetzten Job übersprungen
+        targets = self.ledger.targets(job["id"])
+        failed = []
+        media_ids = []
+        with ThreadPoolExecutor(max_workers=len(self.accounts), thread_name_prefix="fan-out") as pool:
+            # bind: Spans der Pool-Threads gehören zum Lauf des Jobs
+            post = metrics.bind(self._post)
+            futures = {a["name"]: pool.submit(post, job, a, targets.get(a["name"]), publish_at) for a in self.accounts}
+            for name, future in futures.items():
+                try:
+                    media_id = future.result()
+                except Exception:
+                    print(f"[ERROR] Post auf {name} fehlgeschlagen:\n{traceback.format_exc()}")
+                    failed.append(name)
+                    continue
+                if media_id is not None:
+                    media_ids.append(media_id)
+        if failed:
+            # Job bleibt "uploaded"; der nächste Versuch postet nur auf die fehlenden Konten
+            raise LedgerError(f"Fan-out unvollständig: {', '.join(failed)}")
+        if not media_ids:
+            # Nichts gepostet: Job bleibt "uploaded", bis ein Konto wieder Budget hat
+            raise LedgerDeferred("Tagesbudget aller Konten erschöpft")
+        metrics.annotate(media_id=",".join(media_ids), accounts=len(media_ids))
+        return media_ids
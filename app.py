@@ -1,19 +1,19 @@
 import os
-import time
-import random
 import datetime
 import threading
-import numpy as np
-from PIL import Image, ImageDraw, ImageFont
-from flask import Flask, request
-from moviepy.editor import VideoFileClip, ImageClip, CompositeVideoClip
-import cloudinary
-import cloudinary.uploader
-import requests
+from flask import Flask, Response, jsonify, request
 import traceback
-
-if not hasattr(Image, "ANTIALIAS"):
-    Image.ANTIALIAS = Image.Resampling.LANCZOS
+from math_video import generate_equation_variant, create_math_video
+from prerender_queue import fill_queue
+from pipeline import Pipeline
+from render_cache import get_or_create_url, cache_stats
+import retention
+import metrics
+from jobs import JobQueue, QueueFull
+from ledger import Ledger
+from accounts import AccountRegistry, load_accounts
+from posting import PostRunner
+import scheduler
 
 # === ENV ===
 CLOUD_NAME = os.environ.get("CLOUD_NAME")
@@ -21,146 +21,176 @@ API_KEY = os.environ.get("API_KEY")
 API_SECRET = os.environ.get("API_SECRET")
 INSTAGRAM_USER_ID = os.environ.get("INSTAGRAM_USER_ID")
 ACCESS_TOKEN = os.environ.get("ACCESS_TOKEN")
-OUTPUT_FOLDER = "daily_tiktoks"
-os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 
-if not all([CLOUD_NAME, API_KEY, API_SECRET, INSTAGRAM_USER_ID, ACCESS_TOKEN]):
+# Konten aus INSTAGRAM_ACCOUNTS/ACCOUNTS_FILE, sonst das Einzelkonto aus INSTAGRAM_USER_ID/ACCESS_TOKEN
+ACCOUNTS = load_accounts()
+
+if not all([CLOUD_NAME, API_KEY, API_SECRET]) or not ACCOUNTS:
     raise EnvironmentError("Mindestens eine Umgebungsvariable fehlt.")
 
-# === Equation Generator ===
-def generate_equation_variant():
-    variant = random.randint(1, 8)
-    if variant == 1:
-        m, x, b = random.randint(1, 9), random.randint(1, 9), random.randint(1, 9)
-        y = m * x + b
-        return f"{m}x + {b} = {y}"
-    elif variant == 2:
-        a, x, b = random.randint(1, 5), random.randint(1, 10), random.randint(1, 10)
-        return f"{a}(x + {b}) = {a * (x + b)}"
-    elif variant == 3:
-        x, b = random.randint(1, 10), random.randint(1, 10)
-        y = x + b
-        y += (3 - y % 3) if y % 3 != 0 else 0
-        return f"(x + {b}) / 3 = {y // 3}"
-    elif variant in [4, 6]:
-        r1, r2 = random.randint(1, 5), random.randint(1, 5)
-        return f"(x + {r1})(x - {r2}) = 0"
-    elif variant == 5:
-        while True:
-            a, b, c = random.randint(1, 5), random.randint(1, 10), random.randint(1, 10)
-            if b**2 - 4*a*c > 0:
-                return f"{a}x² + {b}x + {c} = 0"
-    elif variant == 7:
-        m, x, b = -random.randint(1, 9), random.randint(1, 9), random.randint(-10, 10)
-        y = m * x + b
-        return f"{m}x + {b} = {y}"
-    elif variant == 8:
-        s, x = random.randint(1, 9), random.randint(1, 10)
-        return f"(x + {s})² = {(x + s) ** 2}"
-
-# === Text to Image ===
-def create_text_image(text, width, height):
-    img = Image.new("RGBA", (width, height), (255, 255, 255, 0))
-    draw = ImageDraw.Draw(img)
-    try:
-        font = ImageFont.truetype("Arial.ttf", 55)
-    except:
-        font_path = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
-        font = ImageFont.truetype(font_path, 55) if os.path.exists(font_path) else ImageFont.load_default()
-    bbox = draw.textbbox((0, 0), text, font=font)
-    w, h = bbox[2] - bbox[0], bbox[3] - bbox[1]
-    draw.text(((width - w) // 2, (height - h) // 2), text, font=font, fill="black")
-    return np.array(img)
-
-# === Video erstellen ===
-def create_math_video():
-    equation = generate_equation_variant()
-    print(f"[INFO] Generierte Gleichung: {equation}")
-
-    template_path = os.path.join(OUTPUT_FOLDER, "Vorlage.mp4")
-    if not os.path.isfile(template_path):
-        raise FileNotFoundError(f"Vorlage.mp4 nicht gefunden unter: {template_path}")
-
-    clip = VideoFileClip(template_path).subclip(0, 3).resize(height=1080)
-    text_np = create_text_image(equation, clip.w, 200)
-    text_clip = ImageClip(text_np, duration=clip.duration).set_position("center")
-    final = CompositeVideoClip([clip, text_clip])
-
-    filename = os.path.join(OUTPUT_FOLDER, f"{datetime.date.today()}_{int(time.time())}_math_video.mp4")
-    final.write_videofile(filename, codec="libx264", audio=False, fps=24, preset="ultrafast", threads=2)
-
-    print(f"[INFO] Video gespeichert: {filename}")
-    return filename
+# Nach dem ersten Request Render- und Upload-Stack im Hintergrund laden
+WARMUP = os.environ.get("WARMUP", "1") == "1"
+
+# Hält fest, wie weit jeder Post gekommen ist, damit ein Neustart dort weitermacht
+ledger = Ledger()
+# Ein Graph-Client je Konto; jede Session hält ihre TLS-Verbindungen offen
+accounts = AccountRegistry(ACCOUNTS, ledger)
+graph = accounts.clients[ACCOUNTS[0]["name"]]
 
 # === Upload zu Cloudinary ===
+# cloudinary, NumPy und moviepy werden erst im Worker geladen, nicht beim Kaltstart
 def upload_to_cloudinary(filepath):
+    import cloudinary.uploader
     cloudinary.config(cloud_name=CLOUD_NAME, api_key=API_KEY, api_secret=API_SECRET)
     print(f"[INFO] Upload {filepath} → Cloudinary...")
-    res = cloudinary.uploader.upload_large(filepath, resource_type="video")
+    with metrics.span("upload"):
+        res = cloudinary.uploader.upload_large(filepath, resource_type="video")
     print(f"[INFO] Cloudinary URL: {res['secure_url']}")
+    retention.mark_uploaded(filepath, res)
     return res["secure_url"]
 
-# === Auf Media-Ready warten ===
-def wait_for_media_ready(creation_id, access_token, max_wait=180, interval=5):
-    url = f"https://graph.facebook.com/v18.0/{creation_id}?fields=status_code&access_token={access_token}"
-    waited = 0
-    while waited < max_wait:
-        res = requests.get(url)
-        status = res.json().get("status_code")
-        print(f"[DEBUG] Status für Creation {creation_id}: {status}")
-        if status == "FINISHED":
-            return True
-        time.sleep(interval)
-        waited += interval
-    return False
-
-# === Instagram posten ===
-def post_to_instagram_reels(video_url, caption="Can you solve this? #math #reel #puzzle"):
-    create_url = f"https://graph.facebook.com/v18.0/{INSTAGRAM_USER_ID}/media"
-    publish_url = f"https://graph.facebook.com/v18.0/{INSTAGRAM_USER_ID}/media_publish"
-
-    payload = {
-        "media_type": "REELS",
-        "video_url": video_url,
-        "caption": caption,
-        "access_token": ACCESS_TOKEN
-    }
-
-    print(f"[INFO] Sende Video an Instagram...")
-    res = requests.post(create_url, data=payload)
-    res.raise_for_status()
-    creation_id = res.json()["id"]
-
-    if not wait_for_media_ready(creation_id, ACCESS_TOKEN):
-        print("[ERROR] Media nicht bereit – Abbruch.")
-        return
-
-    res_pub = requests.post(publish_url, data={"creation_id": creation_id, "access_token": ACCESS_TOKEN})
-    res_pub.raise_for_status()
-    print("[INFO] ✅ Reel gepostet.")
+def stream_to_cloudinary(equation=None):
+    import cloudinary
+    from stream_upload import create_and_upload_math_video
+    cloudinary.config(cloud_name=CLOUD_NAME, api_key=API_KEY, api_secret=API_SECRET)
+    return create_and_upload_math_video(equation)
+
+# === Post mit Protokoll ===
+def render_video(equation):
+    from stream_upload import UPLOAD_MODE
+    if UPLOAD_MODE == "stream":
+        return {"video_url": stream_to_cloudinary(equation)}
+    return {"video_url": get_or_create_url(equation, create_math_video, upload_to_cloudinary)}
+
+poster = PostRunner(ledger, graph, render_video, upload_to_cloudinary, generate_equation_variant, accounts=accounts)
+
+# === Mehrere Reels überlappend posten ===
+def post_many(n):
+    # Gleicher Weg wie ein einzelner Post (Protokoll, Konten, Tagesbudget, Aufräumen), nur gestaffelt
+    if not scheduler.in_window():
+        print(f"[INFO] Zeitfenster {scheduler.WINDOW_START_HOUR}–{scheduler.WINDOW_END_HOUR} Uhr nicht erreicht – nichts gepostet.")
+        return []
+    pipeline = Pipeline(
+        render=lambda equation: poster.run(ledger.start(equation), until="rendered"),
+        upload=lambda job: poster.run(job, until="uploaded"),
+        publish=poster.run,
+    )
+    for _ in range(n):
+        pipeline.submit()
+    return pipeline.close()
 
 # === Hauptprozess als Thread ===
-def post_process():
+def post_process(publish_at=None):
     try:
-        now = datetime.datetime.now()
+        now = datetime.datetime.now(scheduler.timezone())
         print(f"[INFO] Start im Hintergrund: {now}")
-        if 10 <= now.hour < 20:
-            video_path = create_math_video()
-            video_url = upload_to_cloudinary(video_path)
-            post_to_instagram_reels(video_url)
+        # Geplante Posts starten schon vor dem Slot, eventuell also kurz vor Fensterbeginn
+        if publish_at is not None or scheduler.in_window(now):
+            with metrics.run("post"):
+                poster.post(publish_at)
         else:
-            print("[INFO] Zeitfenster 10–20 Uhr nicht erreicht.")
+            print(f"[INFO] Zeitfenster {scheduler.WINDOW_START_HOUR}–{scheduler.WINDOW_END_HOUR} Uhr nicht erreicht – rendere Videos vor.")
+            with metrics.run("prerender"):
+                fill_queue(create_math_video, generate_equation_variant)
     except Exception:
         print(f"[ERROR] Fehler im Hintergrundprozess:\n{traceback.format_exc()}")
+    finally:
+        usage = retention.collect_garbage()
+        print(f"[INFO] Speicher: {usage['files']} Dateien, {usage['bytes'] // 1024} KB belegt, "
+              f"{usage['disk_free_bytes'] // (1024 * 1024)} MB frei")
 
 # === Flask App ===
 app = Flask(__name__)
 
+# Ein Worker statt eines Threads pro Aufruf: Pings und Doppel-Trigger starten keine parallelen Renders
+job_queue = JobQueue(post_process)
+if ledger.next_unfinished() is not None:
+    print("[INFO] Unterbrochene Posts im Protokoll – setze sie im Hintergrund fort.")
+    job_queue.submit()
+
+_warm_up_started = threading.Lock()
+
+def warm_up():
+    try:
+        with metrics.span("warm_up"):
+            import cloudinary.uploader
+            import stream_upload
+            import math_video
+            math_video.warm_up()
+            graph.session
+        print("[INFO] Render- und Upload-Stack vorgeladen.")
+    except Exception:
+        print(f"[WARN] Vorwärmen fehlgeschlagen:\n{traceback.format_exc()}")
+
+@app.after_request
+def start_warm_up(response):
+    # Erst nach der ersten Antwort, damit der Ping nicht auf den Import wartet
+    if WARMUP and _warm_up_started.acquire(blocking=False):
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    return response
+
+# Eigener Zeitplan statt externer Pings; eigener Schlüssel, damit ein Ping den Slot nicht verschluckt
+post_scheduler = scheduler.Scheduler(lambda slot: job_queue.submit(key="scheduled", publish_at=slot))
+if os.environ.get("SCHEDULER_ENABLED") == "1":
+    post_scheduler.start()
+
 @app.route("/", methods=["GET", "HEAD"])
 def trigger_post():
     print("[DEBUG] Trigger endpoint wurde aufgerufen")  # <=== HIER NEU
-    threading.Thread(target=post_process).start()
-    return "🚀 Upload gestartet – läuft im Hintergrund.", 200
+    try:
+        job, created = job_queue.submit()
+    except QueueFull as e:
+        return jsonify({"message": f"⏳ Warteschlange voll: {e}"}), 429, {"Retry-After": "60"}
+    message = "🚀 Upload gestartet – läuft im Hintergrund." if created else "🔁 Bereits eingeplant – an laufenden Job angehängt."
+    return jsonify({"message": message, "job_id": job["id"], "status": job["status"]}), 200, {"X-Job-Id": job["id"]}
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "unbekannter Job"}), 404
+    return jsonify(job)
+
+@app.route("/metrics")
+def metrics_endpoint():
+    usage = retention.disk_usage()
+    cache = cache_stats()
+    gauges = {
+        "poster_disk_files": usage["files"],
+        "poster_disk_bytes": usage["bytes"],
+        "poster_disk_free_bytes": usage["disk_free_bytes"],
+        "poster_render_cache_bytes": cache["local_bytes"],
+        **{f"poster_ledger_jobs_{stage}": count for stage, count in ledger.counts().items()},
+    }
+    counters = {
+        "poster_deleted_files_total": usage["deleted_files"],
+        "poster_render_cache_hits_total": cache["hits"],
+        "poster_render_cache_misses_total": cache["misses"],
+    }
+    return Response(metrics.render_prometheus(gauges, counters), mimetype="text/plain; version=0.0.4")
+
+@app.route("/schedule")
+def schedule_endpoint():
+    n = min(int(request.args.get("n", 5)), 50)
+    lead = post_scheduler.lead
+    # Ohne SCHEDULER_ENABLED postet niemand nach diesem Plan: nur eine frische Vorschau zeigen
+    planner = post_scheduler if post_scheduler.running else scheduler.Scheduler(None, lead_seconds=lead.total_seconds())
+    return jsonify({
+        "running": post_scheduler.running,
+        "timezone": str(scheduler.timezone()),
+        "window": [scheduler.WINDOW_START_HOUR, scheduler.WINDOW_END_HOUR],
+        "in_window": scheduler.in_window(),
+        "lead_seconds": lead.total_seconds(),
+        "upcoming": [{"slot": slot.isoformat(), "start": (slot - lead).isoformat()} for slot in planner.upcoming(n)],
+    })
+
+@app.route("/accounts")
+def accounts_endpoint():
+    return jsonify(accounts.status())
+
+@app.route("/runs")
+def runs_endpoint():
+    return jsonify(metrics.recent_runs())
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 10000))
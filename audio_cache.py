@@ -0,0 +1,37 @@
+import os
+import hashlib
+import threading
+import subprocess
+import imageio_ffmpeg
+
+AUDIO_FOLDER = os.path.join("daily_tiktoks", "audio")
+AUDIO_BITRATE = os.environ.get("AUDIO_BITRATE", "128k")
+
+_lock = threading.Lock()
+
+# === Gekürzte Tonspur einmal als AAC kodieren ===
+def _cache_path(source, duration, bitrate):
+    # Quelle, Länge und Bitrate bestimmen die Bytes; ändert sich etwas, entsteht eine neue Datei
+    st = os.stat(source)
+    key = (os.path.abspath(source), st.st_mtime_ns, st.st_size, float(duration), bitrate)
+    digest = hashlib.sha1(repr(key).encode()).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(AUDIO_FOLDER, f"{stem}_{float(duration):g}s_{digest}.aac")
+
+def cached_audio(source, duration, bitrate=AUDIO_BITRATE):
+    # ADTS-Elementarstrom; der Video-Writer übernimmt ihn per -acodec copy ohne Dekodieren
+    path = _cache_path(source, duration, bitrate)
+    with _lock:
+        if os.path.isfile(path):
+            return path
+        os.makedirs(AUDIO_FOLDER, exist_ok=True)
+        tmp_path = f"{path[:-4]}.{os.getpid()}.tmp.aac"
+        print(f"[INFO] Kodiere Tonspur {source} ({duration:g}s) → {path}")
+        try:
+            subprocess.run([imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-loglevel", "error", "-i", source, "-t", str(duration),
+                            "-vn", "-c:a", "aac", "-b:a", bitrate, "-f", "adts", tmp_path], check=True)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return path
@@ -0,0 +1,107 @@
+import os
+import re
+import time
+import argparse
+import statistics
+import subprocess
+import tempfile
+import imageio_ffmpeg
+from encode_profiles import get_profile, x264_extra_params
+import audio_cache
+
+TEMPLATE_PATH = os.path.join("daily_tiktoks", "Vorlage.mp4")
+AUDIO_PATH = "sound.mp3"
+
+# === Zwei Wege, dieselbe Tonspur anzuhängen ===
+def _clip(duration):
+    from moviepy.editor import VideoFileClip
+    source = VideoFileClip(TEMPLATE_PATH)
+    return source, source.subclip(0, duration)
+
+def render_legacy(filename, duration, encode):
+    # Bisheriger Weg aus tiktok.py: mp3 dekodieren, über temp-audio.m4a nach AAC, dann muxen
+    from moviepy.editor import AudioFileClip
+    source, clip = _clip(duration)
+    audio = AudioFileClip(AUDIO_PATH)
+    try:
+        final = clip.set_audio(audio.set_duration(clip.duration))
+        final.write_videofile(filename, codec="libx264", audio_codec="aac", temp_audiofile=f"{filename}.temp-audio.m4a", remove_temp=True,
+                              fps=encode["fps"], preset=encode["preset"], threads=encode["threads"],
+                              ffmpeg_params=x264_extra_params(encode["crf"], encode["gop"], encode["tune"]), logger=None)
+    finally:
+        audio.close()
+        source.close()
+
+def render_cached(filename, duration, encode):
+    source, clip = _clip(duration)
+    try:
+        clip.write_videofile(filename, codec="libx264", audio=audio_cache.cached_audio(AUDIO_PATH, clip.duration),
+                             fps=encode["fps"], preset=encode["preset"], threads=encode["threads"],
+                             ffmpeg_params=x264_extra_params(encode["crf"], encode["gop"], encode["tune"]), logger=None)
+    finally:
+        source.close()
+
+def audio_step_legacy(tmp, duration):
+    # Nur der Audioanteil des bisherigen Wegs: mp3 dekodieren und nach AAC kodieren
+    from moviepy.editor import AudioFileClip
+    audio = AudioFileClip(AUDIO_PATH)
+    try:
+        start = time.perf_counter()
+        audio.set_duration(duration).write_audiofile(os.path.join(tmp, "temp-audio.m4a"), codec="aac", logger=None)
+        return time.perf_counter() - start
+    finally:
+        audio.close()
+        os.remove(os.path.join(tmp, "temp-audio.m4a"))
+
+def audio_step_cached(duration):
+    start = time.perf_counter()
+    audio_cache.cached_audio(AUDIO_PATH, duration)
+    return time.perf_counter() - start
+
+def audio_stream(filename):
+    # "Stream #0:1(und): Audio: aac (LC) ..." aus der ffmpeg-Ausgabe
+    proc = subprocess.run([imageio_ffmpeg.get_ffmpeg_exe(), "-hide_banner", "-i", filename], capture_output=True, text=True)
+    match = re.search(r"Audio: ([^\n]+)", proc.stderr)
+    return match.group(1) if match else None
+
+def _timed(fn, filename, duration, encode):
+    start = time.perf_counter()
+    fn(filename, duration, encode)
+    return time.perf_counter() - start
+
+# === Bericht ===
+def run(repeat=3, duration=5, profile=None):
+    name, encode = get_profile(profile, default="quality")
+    with tempfile.TemporaryDirectory() as tmp:
+        # Eigener Cache-Ordner, damit der erste Lauf wirklich kalt ist
+        audio_cache.AUDIO_FOLDER = os.path.join(tmp, "audio")
+        out = os.path.join(tmp, "out.mp4")
+
+        cold = _timed(render_cached, out, duration, encode)
+        results = {"legacy": [], "cached": []}
+        for _ in range(repeat):
+            for label, fn in (("legacy", render_legacy), ("cached", render_cached)):
+                results[label].append(_timed(fn, out, duration, encode))
+        audio_legacy = statistics.median(audio_step_legacy(tmp, duration) for _ in range(repeat))
+        audio_cached = statistics.median(audio_step_cached(duration) for _ in range(repeat))
+        stream = audio_stream(out)
+        leftovers = [f for f in os.listdir(tmp) if "temp-audio" in f]
+
+    legacy, cached = statistics.median(results["legacy"]), statistics.median(results["cached"])
+    print(f"[INFO] Profil {name}, {duration}s Video, Median aus {repeat} Läufen")
+    print(f"  ohne Cache (AudioFileClip + AAC + temp-audio.m4a): {legacy:6.2f}s")
+    print(f"  mit Cache  (-acodec copy):                         {cached:6.2f}s  ({legacy - cached:+.2f}s gespart, "
+          f"{100 * (legacy - cached) / legacy:.0f} %)")
+    print(f"  davon Audio: {audio_legacy * 1000:.0f} ms ohne Cache, {audio_cached * 1000:.2f} ms mit Cache")
+    print(f"  erster Lauf mit leerem Cache:                      {cold:6.2f}s")
+    print(f"  Tonspur im Ergebnis: {stream or 'FEHLT'}; liegengebliebene Temp-Dateien: {len(leftovers)}")
+    return {"legacy_seconds": legacy, "cached_seconds": cached, "cold_seconds": cold,
+            "audio_legacy_seconds": audio_legacy, "audio_cached_seconds": audio_cached, "audio": stream}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vergleicht das Rendern mit und ohne gecachte AAC-Tonspur.")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Anzahl Läufe je Variante")
+    parser.add_argument("-d", "--duration", type=float, default=5, help="Videolänge in Sekunden")
+    parser.add_argument("-p", "--profile", default=None, help="Encode-Profil (Standard: ENCODE_PROFILE oder quality)")
+    args = parser.parse_args()
+    run(args.repeat, args.duration, args.profile)
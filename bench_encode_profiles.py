@@ -0,0 +1,76 @@
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+from encode_profiles import PROFILES
+
+# === Messung in einem frischen Prozess pro Profil ===
+def _cpu(who):
+    usage = resource.getrusage(who)
+    return usage.ru_utime + usage.ru_stime
+
+def _child(n):
+    # ENCODE_PROFILE kommt über die Umgebung, math_video liest es beim Import
+    from math_video import ENCODE_PROFILE, RENDER_SETTINGS, TEMPLATE_PATH, create_math_video, generate_equation_variant
+    from template_cache import get_template_frames
+
+    cfg = RENDER_SETTINGS
+    get_template_frames(TEMPLATE_PATH, height=cfg["height"], duration=cfg["duration"], fps=cfg["fps"])
+    os.remove(create_math_video("0 = 0"))
+
+    runs = []
+    for _ in range(n):
+        cpu_self, cpu_children = _cpu(resource.RUSAGE_SELF), _cpu(resource.RUSAGE_CHILDREN)
+        start = time.perf_counter()
+        filename = create_math_video(generate_equation_variant())
+        runs.append({
+            "seconds": time.perf_counter() - start,
+            "cpu_seconds": _cpu(resource.RUSAGE_SELF) - cpu_self,
+            "ffmpeg_cpu_seconds": _cpu(resource.RUSAGE_CHILDREN) - cpu_children,
+            "bytes": os.path.getsize(filename),
+        })
+        os.remove(filename)
+
+    # ru_maxrss ist unter Linux in KB
+    result = {
+        "profile": ENCODE_PROFILE,
+        "videos": n,
+        "wall_seconds": sum(r["seconds"] for r in runs) / n,
+        "cpu_seconds": sum(r["cpu_seconds"] for r in runs) / n,
+        "ffmpeg_cpu_seconds": sum(r["ffmpeg_cpu_seconds"] for r in runs) / n,
+        "bytes": sum(r["bytes"] for r in runs) // n,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "ffmpeg_peak_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    }
+    print(json.dumps(result))
+
+def run(profiles=None, n=5):
+    results = []
+    for name in profiles or PROFILES:
+        print(f"[INFO] Profil '{name}': {n} Videos...")
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", "-n", str(n)],
+                              env={**os.environ, "ENCODE_PROFILE": name}, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"[ERROR] Profil '{name}' fehlgeschlagen:\n{proc.stderr}")
+            continue
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(f"\n{'Profil':10s} {'Wand s':>7s} {'CPU s':>7s} {'ffmpeg s':>9s} {'RSS MB':>7s} {'ffmpeg MB':>9s} {'KB/Video':>9s}")
+    for r in results:
+        print(f"{r['profile']:10s} {r['wall_seconds']:7.2f} {r['cpu_seconds']:7.2f} {r['ffmpeg_cpu_seconds']:9.2f} "
+              f"{r['peak_rss_mb']:7.0f} {r['ffmpeg_peak_rss_mb']:9.0f} {r['bytes'] / 1024:9.1f}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rendert die echte Vorlage mit jedem Encode-Profil und vergleicht Kosten.")
+    parser.add_argument("profiles", nargs="*", help=f"Profile (Standard: alle – {', '.join(PROFILES)})")
+    parser.add_argument("-n", type=int, default=5, help="Videos pro Profil")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(args.n)
+    else:
+        run(args.profiles, args.n)
@@ -0,0 +1,93 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+# Diese Pakete gehören in den Worker-Pfad, nicht in den Kaltstart der Flask-App
+HEAVY = ("numpy", "moviepy", "imageio", "imageio_ffmpeg", "PIL", "cloudinary", "requests", "scipy")
+
+# Kindprozess: App importieren und den ersten "/"-Request beantworten; der Post-Job selbst ist ein No-op
+CHILD = """
+import time, json, sys
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.job_queue.target = lambda **kwargs: None
+res = app.app.test_client().get("/")
+done = time.perf_counter()
+print(json.dumps({"status": res.status_code, "import_ms": (imported - start) * 1000, "first_response_ms": (done - start) * 1000}))
+"""
+
+def _env(tmp):
+    fake = {k: "bench" for k in ("CLOUD_NAME", "API_KEY", "API_SECRET", "INSTAGRAM_USER_ID", "ACCESS_TOKEN")}
+    # Ledger in ein Wegwerfverzeichnis, Vorwärmen aus, damit nur der Kaltstart gemessen wird
+    return {**os.environ, **fake, "LEDGER_PATH": os.path.join(tmp, "ledger.sqlite3"), "WARMUP": "0", "SCHEDULER_ENABLED": "0"}
+
+# === -X importtime auswerten ===
+def parse_importtime(stderr):
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({"module": name.strip(), "depth": (len(name) - len(name.lstrip())) // 2,
+                        "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+    return modules
+
+def import_profile(module="app"):
+    with tempfile.TemporaryDirectory() as tmp:
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                              env=_env(tmp), capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if proc.returncode != 0:
+        raise RuntimeError(f"Import von {module} fehlgeschlagen:\n{proc.stderr[-2000:]}")
+    return parse_importtime(proc.stderr)
+
+def first_response():
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", CHILD], env=_env(tmp), capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)))
+        wall = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"Kindprozess fehlgeschlagen:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["process_ms"] = wall
+    return result
+
+# === Bericht ===
+def run(repeat=5, top=10, budget_ms=None):
+    modules = import_profile()
+    app_ms = next(m["cumulative_ms"] for m in reversed(modules) if m["module"] == "app")
+    heavy = sorted({m["module"] for m in modules if m["module"].split(".")[0] in HEAVY})
+
+    runs = [first_response() for _ in range(repeat)]
+    summary = {key: statistics.median(r[key] for r in runs) for key in ("import_ms", "first_response_ms", "process_ms")}
+
+    print(f"[INFO] import app: {app_ms:.0f} ms laut -X importtime, {len(modules)} Module")
+    print(f"  Teuerste Pakete (kumulativ, oberste Ebene):")
+    for m in sorted((m for m in modules if m["depth"] <= 1), key=lambda m: -m["cumulative_ms"])[:top]:
+        print(f"    {m['cumulative_ms']:8.1f} ms  {m['module']}")
+    print(f"[INFO] Median aus {repeat} Kaltstarts: Import {summary['import_ms']:.0f} ms, "
+          f"erste Antwort auf / nach {summary['first_response_ms']:.0f} ms, Prozess gesamt {summary['process_ms']:.0f} ms")
+
+    ok = True
+    if heavy:
+        ok = False
+        print(f"[ERROR] Schwere Pakete beim Import geladen: {', '.join(heavy[:10])}{' …' if len(heavy) > 10 else ''}")
+    if budget_ms is not None and summary["first_response_ms"] > budget_ms:
+        ok = False
+        print(f"[ERROR] Erste Antwort {summary['first_response_ms']:.0f} ms über Budget {budget_ms:.0f} ms")
+    return ok, summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Misst Importzeit und erste Antwort der Flask-App nach einem Kaltstart.")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Anzahl Kaltstarts")
+    parser.add_argument("--top", type=int, default=10, help="Anzahl angezeigter Pakete")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Obergrenze für die erste Antwort (Exit-Code 1 bei Überschreitung)")
+    args = parser.parse_args()
+    ok, _ = run(args.repeat, args.top, args.budget_ms)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,184 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+from fake_services import FakeCloudinary, FakeGraphAPI
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+
+# Lasttest ohne echte Cloud: post_process() über die Job-Queue bzw. den Scheduler gegen lokale Stand-ins.
+# Die Module lesen ihre Konfiguration beim Import, deshalb wird app erst nach dem Setzen der Umgebung geladen.
+
+def _percentile(values, q):
+    # Nächster Rang, reicht für Berichte aus wenigen hundert Werten
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, int(round(q / 100 * len(values) + 0.5)) - 1))]
+
+def _disk_bytes(folder):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(folder) for name in names)
+
+# === Umgebung ===
+def _prepare(tmp, args, cloud, graph):
+    # Eigenes Arbeitsverzeichnis: Ledger, Warteschlange, Caches und Videos landen nicht im Repo
+    folder = os.path.join(tmp, "daily_tiktoks")
+    os.makedirs(folder)
+    template = os.path.join(REPO, "daily_tiktoks", "Vorlage.mp4")
+    try:
+        os.symlink(template, os.path.join(folder, "Vorlage.mp4"))
+    except OSError:
+        shutil.copy(template, folder)
+
+    env = {
+        "CLOUD_NAME": "load", "API_KEY": "load", "API_SECRET": "load",
+        "GRAPH_API_BASE": graph.base_url,
+        "LEDGER_PATH": os.path.join(folder, "ledger.sqlite3"),
+        "WARMUP": "0", "SCHEDULER_ENABLED": "0",
+        "JOB_WORKERS": str(args.concurrency), "JOB_MAX_PENDING": str(args.jobs), "JOB_COALESCE_SECONDS": "0",
+        "METRICS_MAX_RUNS": str(args.jobs + 10),
+        # Rund um die Uhr im Zeitfenster, Slots ohne Vorlauf
+        "POST_WINDOW_START": "0", "POST_WINDOW_END": "24", "SCHEDULE_LEAD_SECONDS": "0",
+    }
+    if args.accounts > 1:
+        env["INSTAGRAM_ACCOUNTS"] = json.dumps([{"name": f"load{i}", "user_id": f"user{i}", "access_token": f"token{i}",
+                                                 "max_posts_per_day": args.jobs} for i in range(args.accounts)])
+    else:
+        env.update(INSTAGRAM_USER_ID="user0", ACCESS_TOKEN="token0")
+    for key in ("RENDER_ENGINE", "UPLOAD_MODE"):
+        value = getattr(args, key.lower())
+        if value:
+            env[key] = value
+    os.environ.update(env)
+    os.chdir(tmp)
+    sys.path.insert(0, REPO)
+
+# === Last erzeugen ===
+def drive_queue(app, scheduler, jobs):
+    # Alle Posts auf einmal einreihen; JOB_WORKERS Worker arbeiten sie parallel ab
+    return [app.job_queue.submit(key=f"load-{i}", publish_at=scheduler.now())[0]["id"] for i in range(jobs)]
+
+def drive_scheduler(app, scheduler, jobs):
+    # Der echte Planer-Loop, nur ohne Streuung: jeder Slot ist sofort fällig
+    submitted = []
+
+    def post(slot):
+        submitted.append(app.job_queue.submit(key=f"slot-{len(submitted)}", publish_at=slot)[0]["id"])
+        if len(submitted) >= jobs:
+            planner.stop()
+
+    planner = scheduler.Scheduler(post, lead_seconds=0, jitter_minutes=(0, 0))
+    planner.run_forever()
+    return submitted
+
+def _wait(app, job_ids, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if all(app.job_queue.get(job_id)["status"] in ("done", "failed") for job_id in job_ids):
+            return True
+        time.sleep(0.2)
+    return False
+
+# === Lauf ===
+def run(args):
+    cloud = FakeCloudinary(latency=args.cloud_latency).start()
+    graph = FakeGraphAPI(latency=args.graph_latency, processing_delay=args.processing_delay).start()
+    tmp = tempfile.mkdtemp(prefix="bench_load_")
+    cwd = os.getcwd()
+    try:
+        _prepare(tmp, args, cloud, graph)
+        import cloudinary
+        import app
+        import metrics
+        import scheduler
+        import math_video
+        cloudinary.config(upload_prefix=cloud.url)
+
+        # Vorlage dekodieren und Glyphen rastern, bevor die Uhr läuft
+        start = time.perf_counter()
+        math_video.warm_up()
+        warm_up_seconds = time.perf_counter() - start
+
+        self_before, children_before = resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN)
+        start = time.perf_counter()
+        drive = drive_scheduler if args.mode == "scheduler" else drive_queue
+        job_ids = drive(app, scheduler, args.jobs)
+        finished = _wait(app, job_ids, args.timeout)
+        wall = time.perf_counter() - start
+        self_after, children_after = resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN)
+
+        runs = [r for r in metrics.recent_runs() if r["kind"] == "post"]
+        stages = {}
+        for r in runs:
+            for span in r["spans"]:
+                stages.setdefault(span["stage"], []).append(span["seconds"])
+        stages["post_total"] = [r["seconds"] for r in runs if "seconds" in r]
+
+        ok = sum(r["status"] == "ok" for r in runs)
+        report = {
+            "mode": args.mode, "jobs": args.jobs, "concurrency": args.concurrency, "accounts": args.accounts,
+            "finished": finished, "ok": ok, "failed": len(runs) - ok,
+            "published": len(graph.published), "ledger": app.ledger.counts(),
+            "wall_seconds": round(wall, 2), "warm_up_seconds": round(warm_up_seconds, 2),
+            "jobs_per_hour": round(3600 * ok / wall, 1) if wall else 0.0,
+            "stages": {stage: {"n": len(values), **{f"p{q}": round(_percentile(values, q), 3) for q in (50, 90, 99)},
+                               "max": round(max(values), 3)} for stage, values in sorted(stages.items()) if values},
+            "resources": {
+                "cpu_seconds": round(self_after.ru_utime + self_after.ru_stime - self_before.ru_utime - self_before.ru_stime, 2),
+                "ffmpeg_cpu_seconds": round(children_after.ru_utime + children_after.ru_stime
+                                            - children_before.ru_utime - children_before.ru_stime, 2),
+                # ru_maxrss: Linux in KB
+                "max_rss_mb": round(self_after.ru_maxrss / 1024, 1),
+                "ffmpeg_max_rss_mb": round(children_after.ru_maxrss / 1024, 1),
+                "disk_mb": round(_disk_bytes(tmp) / (1024 * 1024), 1),
+                "cloudinary_requests": cloud.requests, "uploaded_mb": round(sum(map(len, cloud.files.values())) / (1024 * 1024), 1),
+                "graph_requests": graph.requests, "status_polls": graph.status_polls,
+            },
+        }
+    finally:
+        os.chdir(cwd)
+        cloud.stop()
+        graph.stop()
+        if not args.keep:
+            shutil.rmtree(tmp, ignore_errors=True)
+    return report
+
+def print_report(report):
+    res = report["resources"]
+    print(f"\n[INFO] Lasttest ({report['mode']}): {report['jobs']} Posts, {report['concurrency']} parallel, "
+          f"{report['accounts']} Konto/Konten")
+    print(f"  {report['ok']} ok, {report['failed']} fehlgeschlagen, {report['published']} veröffentlicht, "
+          f"Ledger {report['ledger']}{'' if report['finished'] else ' – ZEITÜBERSCHREITUNG'}")
+    print(f"  {report['wall_seconds']:.1f}s → {report['jobs_per_hour']:.0f} Posts/Stunde (Vorwärmen {report['warm_up_seconds']:.1f}s)")
+    print(f"  {'Stufe':18s} {'n':>5s} {'p50':>8s} {'p90':>8s} {'p99':>8s} {'max':>8s}")
+    for stage, s in report["stages"].items():
+        print(f"  {stage:18s} {s['n']:5d} {s['p50']:7.3f}s {s['p90']:7.3f}s {s['p99']:7.3f}s {s['max']:7.3f}s")
+    print(f"  CPU {res['cpu_seconds']:.1f}s (Python inkl. Stand-ins) + {res['ffmpeg_cpu_seconds']:.1f}s ffmpeg, "
+          f"max RSS {res['max_rss_mb']:.0f} MB / ffmpeg {res['ffmpeg_max_rss_mb']:.0f} MB, Disk {res['disk_mb']:.1f} MB")
+    print(f"  Cloudinary: {res['cloudinary_requests']} Requests, {res['uploaded_mb']:.1f} MB; "
+          f"Graph: {res['graph_requests']} Requests, davon {res['status_polls']} Status-Abfragen")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lasttest der Post-Pipeline gegen lokale Cloudinary- und Graph-API-Stand-ins.")
+    parser.add_argument("-n", "--jobs", type=int, default=20, help="Anzahl Posts")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="Parallele Worker (JOB_WORKERS)")
+    parser.add_argument("--mode", choices=("queue", "scheduler"), default="queue", help="Job-Queue direkt oder über den Scheduler-Loop")
+    parser.add_argument("--accounts", type=int, default=1, help="Anzahl Instagram-Konten (Fan-out ab 2)")
+    parser.add_argument("--cloud-latency", type=float, default=0.05, help="Latenz je Cloudinary-Request in Sekunden")
+    parser.add_argument("--graph-latency", type=float, default=0.05, help="Latenz je Graph-Request in Sekunden")
+    parser.add_argument("--processing-delay", type=float, default=3.0, help="Sekunden bis ein Container FINISHED meldet")
+    parser.add_argument("--render-engine", default=None, help="RENDER_ENGINE für den Lauf (raw, concat, stream, moviepy)")
+    parser.add_argument("--upload-mode", default=None, help="UPLOAD_MODE für den Lauf (file, stream)")
+    parser.add_argument("--timeout", type=float, default=1800, help="Abbruch nach so vielen Sekunden")
+    parser.add_argument("--json", default=None, help="Bericht zusätzlich als JSON schreiben")
+    parser.add_argument("--keep", action="store_true", help="Arbeitsverzeichnis nicht löschen")
+    args = parser.parse_args()
+
+    report = run(args)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    sys.exit(0 if report["finished"] and report["failed"] == 0 else 1)
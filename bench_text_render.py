@@ -0,0 +1,123 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from math_video import RENDER_SETTINGS, generate_equation_variant
+from text_render import load_font, text_overlay, glyph_cache, fitted_text_overlay
+
+# === Bisherige Pillow-Pfade ===
+def legacy_text_image(text, width, height):
+    # Ursprünglicher Stand: Font bei jedem Aufruf laden, "Arial.ttf" scheitert unter Linux
+    img = Image.new("RGBA", (width, height), (255, 255, 255, 0))
+    draw = ImageDraw.Draw(img)
+    try:
+        font = ImageFont.truetype("Arial.ttf", RENDER_SETTINGS["font_size"])
+    except:
+        font_path = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+        font = ImageFont.truetype(font_path, RENDER_SETTINGS["font_size"]) if os.path.exists(font_path) else ImageFont.load_default()
+    bbox = draw.textbbox((0, 0), text, font=font)
+    w, h = bbox[2] - bbox[0], bbox[3] - bbox[1]
+    draw.text(((width - w) // 2, (height - h) // 2), text, font=font, fill="black")
+    return np.array(img)
+
+def pillow_text_image(text, width, height, size=RENDER_SETTINGS["font_size"], bold=False):
+    # Gleicher Zeichenweg mit dem neuen Font – Referenz für den Pixelvergleich
+    img = Image.new("RGBA", (width, height), (255, 255, 255, 0))
+    draw = ImageDraw.Draw(img)
+    font = load_font(size, bold)
+    bbox = draw.textbbox((0, 0), text, font=font)
+    w, h = bbox[2] - bbox[0], bbox[3] - bbox[1]
+    draw.text(((width - w) // 2, (height - h) // 2), text, font=font, fill="black")
+    return np.array(img)
+
+# === Messung ===
+def _time(fn, equations, width, height, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for eq in equations:
+            fn(eq, width, height)
+        best = min(best, time.perf_counter() - start)
+    return best / len(equations)
+
+def run(n=500, width=607, height=RENDER_SETTINGS["text_height"], repeat=3):
+    equations = [generate_equation_variant() for _ in range(n)]
+
+    # Font-Laden und Glyphen-Vorrasterung nicht mitmessen
+    pillow_text_image("0", width, height)
+    glyph_cache(RENDER_SETTINGS["font_size"])
+
+    mismatches = sum(not np.array_equal(pillow_text_image(eq, width, height), text_overlay(eq, width, height))
+                     for eq in equations)
+    results = {
+        "legacy": _time(legacy_text_image, equations, width, height, repeat),
+        "pillow": _time(pillow_text_image, equations, width, height, repeat),
+        "glyphs": _time(text_overlay, equations, width, height, repeat),
+    }
+    cropped = [glyph_cache(RENDER_SETTINGS["font_size"]).render(eq)[0] for eq in equations]
+    print(f"[INFO] {n} Gleichungen, Leinwand {width}x{height}, bester von {repeat} Durchläufen")
+    for name, seconds in results.items():
+        print(f"  {name:7s} {seconds * 1e6:8.1f} µs/Bild  ({results['legacy'] / seconds:5.1f}x ggü. legacy)")
+    print(f"  Abweichungen ggü. Pillow: {mismatches}/{n}")
+    print(f"  Ø zugeschnittene Maske: {np.mean([a.size for a in cropped]):.0f} px statt {width * height} px")
+    return results, mismatches
+
+# === tiktok.py: ImageMagick-TextClip gegen fitted_text_overlay ===
+def textclip_overlay(text, width):
+    # Bisheriger Weg: ImageMagick-Prozess schreibt ein temporäres PNG, moviepy liest es zurück
+    from moviepy.editor import TextClip
+    clip = TextClip(text, fontsize=130, color="black", font="Arial-Bold", method="caption", size=(width, None))
+    try:
+        return clip.get_frame(0)
+    finally:
+        clip.close()
+
+def spawn_floor(text, width, tmp):
+    # Untergrenze des Subprozess-Wegs, falls ImageMagick fehlt: ein Prozessstart plus PNG hin und zurück
+    overlay = fitted_text_overlay(text, width)
+    path = os.path.join(tmp, "overlay.png")
+    subprocess.run([shutil.which("true")] if shutil.which("true") else [sys.executable, "-S", "-c", "pass"], check=True)
+    Image.fromarray(overlay).save(path)
+    return np.array(Image.open(path))
+
+def _time_each(fn, equations, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for eq in equations:
+            fn(eq)
+        best = min(best, time.perf_counter() - start)
+    return best / len(equations)
+
+def run_tiktok(n=50, width=1080, repeat=3):
+    equations = [generate_equation_variant() for _ in range(n)]
+    fitted_text_overlay("0", width)
+    results = {"fitted": _time_each(lambda eq: fitted_text_overlay(eq, width), equations, repeat)}
+    try:
+        textclip_overlay(equations[0], width)
+        results["textclip"] = _time_each(lambda eq: textclip_overlay(eq, width), equations, repeat)
+    except Exception as e:
+        print(f"[WARN] TextClip/ImageMagick nicht nutzbar ({type(e).__name__}) – messe nur die Untergrenze eines Subprozesses.")
+        with tempfile.TemporaryDirectory() as tmp:
+            results["spawn_floor"] = _time_each(lambda eq: spawn_floor(eq, width, tmp), equations, repeat)
+
+    print(f"[INFO] tiktok.py-Overlay, {n} Gleichungen, Breite {width}, 130 pt fett, bester von {repeat} Durchläufen")
+    for name, seconds in results.items():
+        print(f"  {name:11s} {seconds * 1e3:8.2f} ms/Bild  ({seconds / results['fitted']:6.1f}x ggü. fitted)")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vergleicht Glyphen-Cache und Pillow beim Text-Overlay.")
+    parser.add_argument("-n", type=int, default=500, help="Anzahl Gleichungen")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Wiederholungen (bester zählt)")
+    parser.add_argument("--tiktok", action="store_true", help="Overlay von tiktok.py gegen ImageMagick-TextClip messen")
+    args = parser.parse_args()
+    if args.tiktok:
+        run_tiktok(args.n, repeat=args.repeat)
+    else:
+        run(args.n, repeat=args.repeat)
@@ -0,0 +1,36 @@
+import os
+
+# Benannte x264-Einstellungen. crf/gop/tune = None heißt: x264-Standard (CRF 23, Keyint 250, kein Tune)
+PROFILES = {
+    # Bisheriger Stand von app.py – schnellstmöglich, byte-identisch zu früheren Renderings
+    "latency": {"fps": 24, "preset": "ultrafast", "crf": None, "gop": None, "tune": None, "threads": 2},
+    # Vorlage ist praktisch ein Standbild: stillimage und ein Keyframe pro Clip; bei diesem Inhalt
+    # liefert veryfast kleinere Dateien als die langsameren Presets
+    "balanced": {"fps": 24, "preset": "veryfast", "crf": 23, "gop": 250, "tune": "stillimage", "threads": 2},
+    # Kleinste Datei für knappe Cloudinary-Bandbreite, Text bleibt bei CRF 28 scharf genug
+    "size": {"fps": 24, "preset": "veryfast", "crf": 28, "gop": 250, "tune": "stillimage", "threads": 2},
+    # Bisheriger Stand von tiktok.py
+    "quality": {"fps": 30, "preset": "medium", "crf": None, "gop": None, "tune": None, "threads": 4},
+}
+ENCODE_PROFILE = os.environ.get("ENCODE_PROFILE")
+
+def get_profile(name=None, default="latency"):
+    name = name or ENCODE_PROFILE or default
+    if name not in PROFILES:
+        raise ValueError(f"Unbekanntes Encode-Profil '{name}' (verfügbar: {', '.join(PROFILES)})")
+    return name, dict(PROFILES[name])
+
+# === ffmpeg-Parameter ===
+def x264_extra_params(crf=None, gop=None, tune=None):
+    # Alles außer -preset/-threads, die moviepy selbst setzt
+    params = []
+    if crf is not None:
+        params += ["-crf", str(crf)]
+    if gop is not None:
+        params += ["-g", str(gop)]
+    if tune:
+        params += ["-tune", tune]
+    return params
+
+def x264_params(preset="ultrafast", threads=2, crf=None, gop=None, tune=None):
+    return ["-preset", preset, *x264_extra_params(crf, gop, tune), "-threads", str(threads)]
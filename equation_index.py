@@ -0,0 +1,229 @@
+import os
+import time
+import heapq
+import threading
+import numpy as np
+
+# Innerhalb dieses Zeitraums wird keine Gleichung zweimal gezogen
+HISTORY_DAYS = float(os.environ.get("EQUATION_HISTORY_DAYS", 7))
+
+# Jede Familie wird gleich oft gezogen, innerhalb der Familie jede Gleichung gleich oft (solange nicht in der Historie)
+FAMILIES = ("linear", "distributive", "fraction", "factored", "quadratic", "negative_slope", "square")
+
+def _grid(*ranges):
+    # Alle Kombinationen der (inklusiven) Wertebereiche als flache Spalten
+    return [g.ravel() for g in np.meshgrid(*(np.arange(lo, hi + 1) for lo, hi in ranges), indexing="ij")]
+
+def _digits(values):
+    return np.log10(np.abs(values) + 1)
+
+# === Familien: (Gleichungen, Lösungen [n, 2], Schwierigkeit) ===
+def _linear():
+    m, x, b = _grid((1, 9), (1, 9), (1, 9))
+    y = m * x + b
+    equations = [f"{m_}x + {b_} = {y_}" for m_, b_, y_ in zip(m.tolist(), b.tolist(), y.tolist())]
+    return equations, np.column_stack([x, np.full(len(x), np.nan)]), 1 + _digits(y)
+
+def _distributive():
+    a, x, b = _grid((1, 5), (1, 10), (1, 10))
+    rhs = a * (x + b)
+    equations = [f"{a_}(x + {b_}) = {r_}" for a_, b_, r_ in zip(a.tolist(), b.tolist(), rhs.tolist())]
+    return equations, np.column_stack([x, np.full(len(x), np.nan)]), 2 + _digits(rhs)
+
+def _fraction():
+    x, b = _grid((1, 10), (1, 10))
+    # Rechte Seite wird auf ein Vielfaches von 3 aufgerundet, die Lösung verschiebt sich entsprechend
+    k = -(-(x + b) // 3)
+    pairs = np.unique(np.column_stack([b, k]), axis=0)
+    b, k = pairs[:, 0], pairs[:, 1]
+    equations = [f"(x + {b_}) / 3 = {k_}" for b_, k_ in zip(b.tolist(), k.tolist())]
+    return equations, np.column_stack([3 * k - b, np.full(len(b), np.nan)]), 2.5 + _digits(k)
+
+def _factored():
+    r1, r2 = _grid((1, 9), (1, 9))
+    equations = [f"(x + {a})(x - {b}) = 0" for a, b in zip(r1.tolist(), r2.tolist())]
+    return equations, np.column_stack([-r1, r2]).astype(float), np.full(len(r1), 3.0)
+
+def _quadratic():
+    a, b, c = _grid((1, 5), (1, 10), (1, 10))
+    disc = b ** 2 - 4 * a * c
+    keep = disc > 0
+    a, b, c, disc = a[keep], b[keep], c[keep], disc[keep]
+    root = np.sqrt(disc)
+    solutions = np.column_stack([(-b + root) / (2 * a), (-b - root) / (2 * a)])
+    # Irrationale Lösungen sind deutlich schwerer als ganzzahlige
+    irrational = np.round(root) ** 2 != disc
+    equations = [f"{a_}x² + {b_}x + {c_} = 0" for a_, b_, c_ in zip(a.tolist(), b.tolist(), c.tolist())]
+    return equations, solutions, 4 + 2 * irrational + _digits(a * c)
+
+def _negative_slope():
+    m, x, b = _grid((-9, -1), (1, 9), (-10, 10))
+    y = m * x + b
+    equations = [f"{m_}x + {b_} = {y_}" for m_, b_, y_ in zip(m.tolist(), b.tolist(), y.tolist())]
+    return equations, np.column_stack([x, np.full(len(x), np.nan)]), 2 + _digits(y) + 0.5 * (b < 0)
+
+def _square():
+    s, x = _grid((1, 9), (1, 10))
+    rhs = (x + s) ** 2
+    equations = [f"(x + {s_})² = {r_}" for s_, r_ in zip(s.tolist(), rhs.tolist())]
+    return equations, np.column_stack([x, -2 * s - x]).astype(float), 3 + _digits(rhs)
+
+BUILDERS = {"linear": _linear, "distributive": _distributive, "fraction": _fraction, "factored": _factored,
+            "quadratic": _quadratic, "negative_slope": _negative_slope, "square": _square}
+
+# === Index aller gültigen Gleichungen ===
+class EquationIndex:
+    def __init__(self, seed=None, history_days=HISTORY_DAYS):
+        equations, families, solutions, difficulty = [], [], [], []
+        for i, name in enumerate(FAMILIES):
+            eqs, sols, diff = BUILDERS[name]()
+            equations += eqs
+            families.append(np.full(len(eqs), i))
+            solutions.append(sols.astype(float))
+            difficulty.append(np.broadcast_to(diff, len(eqs)).astype(float))
+        self.equations = equations
+        self.family = np.concatenate(families)
+        self.solutions = np.concatenate(solutions)
+        self.difficulty = np.round(np.concatenate(difficulty), 2)
+        self._position = {eq: i for i, eq in enumerate(equations)}
+        if len(self._position) != len(equations):
+            raise ValueError("Gleichungen im Index nicht eindeutig")
+
+        self.history_seconds = history_days * 86400
+        # Historie nach Index-Position: Zeitpunkt des letzten Ziehens, dazu ein Heap (Zeitpunkt, Position) zum Ablaufen
+        self._recent = {}
+        self._expiry = []
+        # Pro Familie die Positionen, die gerade nicht in der Historie liegen; _slot merkt sich die Stelle im Pool (-1 = gesperrt)
+        self._pools = [np.flatnonzero(self.family == f).tolist() for f in range(len(FAMILIES))]
+        self._slot = [0] * len(equations)
+        for pool in self._pools:
+            for pos, i in enumerate(pool):
+                self._slot[i] = pos
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.equations)
+
+    def lookup(self, equation):
+        i = self._position.get(equation)
+        if i is None:
+            return None
+        return {"equation": equation, "family": FAMILIES[self.family[i]],
+                "solutions": [s for s in self.solutions[i].tolist() if s == s], "difficulty": float(self.difficulty[i])}
+
+    # === Historie ===
+    def remember(self, equations, when=None):
+        when = time.time() if when is None else when
+        with self._lock:
+            for equation in equations:
+                # Gleichungen, die der Index nicht kennt (alte Varianten im Protokoll), können ohnehin nicht gezogen werden
+                i = self._position.get(equation)
+                if i is not None:
+                    self._mark(i, when)
+
+    def _mark(self, i, when):
+        if when <= self._recent.get(i, float("-inf")):
+            return
+        self._recent[i] = when
+        self._take(i)
+        heapq.heappush(self._expiry, (when, i))
+
+    def _take(self, i):
+        # Aus dem Pool entfernen: letztes Element an die frei gewordene Stelle, O(1)
+        pos = self._slot[i]
+        if pos < 0:
+            return
+        pool = self._pools[self.family[i]]
+        last = pool.pop()
+        if last != i:
+            pool[pos] = last
+            self._slot[last] = pos
+        self._slot[i] = -1
+
+    def _put(self, i):
+        if self._slot[i] >= 0:
+            return
+        pool = self._pools[self.family[i]]
+        self._slot[i] = len(pool)
+        pool.append(i)
+
+    def _expire(self, cutoff):
+        # Abgelaufene Einträge zurück in ihren Pool; veraltete Heap-Einträge (später erneut gezogen) nur verwerfen
+        while self._expiry and self._expiry[0][0] < cutoff:
+            when, i = heapq.heappop(self._expiry)
+            if self._recent.get(i) == when:
+                del self._recent[i]
+                self._put(i)
+
+    def _oldest(self):
+        while self._recent.get(self._expiry[0][1]) != self._expiry[0][0]:
+            heapq.heappop(self._expiry)
+        return self._expiry[0][1]
+
+    # === Ziehen ohne Zurücklegen ===
+    def _pick(self, pools):
+        # Erst die Familie gleichverteilt unter denen mit freien Gleichungen, dann eine Gleichung daraus;
+        # kleine Familien kommen so nach Ablauf der Historie sofort wieder dran
+        families = [pool for pool in pools if pool]
+        if not families:
+            return None
+        pool = families[self._rng.integers(len(families))]
+        return pool, int(self._rng.integers(len(pool)))
+
+    def draw(self):
+        with self._lock:
+            now = time.time()
+            self._expire(now - self.history_seconds)
+            picked = self._pick(self._pools)
+            if picked is not None:
+                pool, pos = picked
+                i = pool[pos]
+            else:
+                print("[WARN] Alle Gleichungen in der Historie – nehme die am längsten nicht gezogene.")
+                i = self._oldest()
+            self._mark(i, now)
+        return self.equations[i]
+
+    def batch(self, n, difficulty=None):
+        # Für Vorrender-Batches: dieselbe Auswahl wie draw(), nur auf einer Kopie der Pools (ggf. nach Schwierigkeit gefiltert)
+        with self._lock:
+            now = time.time()
+            self._expire(now - self.history_seconds)
+            if difficulty is None:
+                pools = [list(pool) for pool in self._pools]
+            else:
+                low, high = difficulty
+                pools = [[i for i in pool if low <= self.difficulty[i] <= high] for pool in self._pools]
+            chosen = []
+            while len(chosen) < n:
+                picked = self._pick(pools)
+                if picked is None:
+                    break
+                pool, pos = picked
+                i = pool[pos]
+                pool[pos] = pool[-1]
+                pool.pop()
+                self._mark(i, now)
+                chosen.append(i)
+            if len(chosen) < n:
+                print(f"[WARN] Nur {len(chosen)} von {n} Gleichungen verfügbar, die nicht in der Historie liegen.")
+        return [self.equations[i] for i in chosen]
+
+# === Gemeinsamer Index ===
+_default = None
+_default_lock = threading.Lock()
+
+def default_index():
+    # Historie aus dem Job-Protokoll und der Vorrender-Warteschlange, damit auch nach einem Neustart nichts doppelt kommt
+    global _default
+    with _default_lock:
+        if _default is None:
+            from ledger import recent_equations
+            from prerender_queue import queued_equations
+            index = EquationIndex()
+            for equation, created in recent_equations(time.time() - index.history_seconds):
+                index.remember([equation], created)
+            index.remember(queued_equations())
+            _default = index
+        return _default
@@ -0,0 +1,175 @@
+import json
+import time
+import uuid
+import threading
+from urllib.parse import urlsplit, parse_qs
+from email import message_from_bytes
+from email.policy import default as default_policy
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Lokale Stand-ins für Tests und Benchmarks ohne echte Cloud-Dienste
+
+# === Gemeinsamer Server-Rahmen ===
+class _FakeServer:
+    def __init__(self, port=0, latency=0.0):
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server._handle(self, "GET")
+
+            def do_POST(self):
+                server._handle(self, "POST")
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = None
+
+    def _handle(self, handler, method):
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = handler.rfile.read(length) if length else b""
+        status, payload, headers = self.handle(method, handler.path, handler.headers, body)
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json" if not isinstance(payload, bytes) else "application/octet-stream")
+        handler.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def handle(self, method, path, headers, body):
+        raise NotImplementedError
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def _parse_multipart(headers, body):
+    msg = message_from_bytes(
+        f"Content-Type: {headers.get('Content-Type')}\r\n\r\n".encode() + body, policy=default_policy
+    )
+    fields, files = {}, {}
+    for part in msg.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if part.get_filename() is not None:
+            files[name] = part.get_payload(decode=True)
+        else:
+            fields[name] = part.get_content()
+    return fields, files
+
+# === Cloudinary (chunked Upload) ===
+class FakeCloudinary(_FakeServer):
+    def __init__(self, port=0, latency=0.0):
+        super().__init__(port, latency)
+        self.uploads = {}
+        self.files = {}
+
+    def handle(self, method, path, headers, body):
+        if method == "GET" and path.startswith("/files/"):
+            data = self.files.get(path[len("/files/"):])
+            return (200, data, None) if data is not None else (404, {"error": {"message": "not found"}}, None)
+        if method != "POST" or not path.endswith("/upload"):
+            return 404, {"error": {"message": f"unbekannter Pfad {path}"}}, None
+
+        fields, files = _parse_multipart(headers, body)
+        chunk = files.get("file", b"")
+        upload_id = headers.get("X-Unique-Upload-Id") or uuid.uuid4().hex
+        content_range = headers.get("Content-Range")
+        if content_range:
+            # Format: "bytes start-end/total", total = -1 solange unbekannt
+            span, total = content_range.split(" ", 1)[1].split("/")
+            start, end = (int(v) for v in span.split("-"))
+            total = int(total)
+        else:
+            start, end, total = 0, len(chunk) - 1, len(chunk)
+
+        with self._lock:
+            upload = self.uploads.setdefault(upload_id, {"data": bytearray(), "public_id": fields.get("public_id") or uuid.uuid4().hex[:20]})
+            if start != len(upload["data"]) or end - start + 1 != len(chunk):
+                return 400, {"error": {"message": f"Content-Range {content_range} passt nicht zu {len(upload['data'])} empfangenen Bytes"}}, None
+            upload["data"] += chunk
+            public_id = upload["public_id"]
+            if total == -1 or len(upload["data"]) < total:
+                return 200, {"public_id": public_id, "done": False}, None
+            self.files[public_id] = bytes(upload["data"])
+            del self.uploads[upload_id]
+
+        return 200, {
+            "public_id": public_id,
+            "resource_type": "video",
+            "bytes": total,
+            "secure_url": f"{self.url}/files/{public_id}",
+            "done": True,
+        }, None
+
+# === Graph API (Container, Status, Publish) ===
+class FakeGraphAPI(_FakeServer):
+    def __init__(self, port=0, latency=0.0, processing_delay=3.0, app_usage=0):
+        super().__init__(port, latency)
+        self.processing_delay = processing_delay
+        self.app_usage = app_usage
+        self.containers = {}
+        self.published = []
+        self.status_polls = 0
+        self.base_url = f"{self.url}/v18.0"
+
+    def handle(self, method, path, headers, body):
+        parts = urlsplit(path)
+        segments = parts.path.strip("/").split("/")[1:]
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        form = {k: v[0] for k, v in parse_qs(body.decode()).items()} if body else {}
+        usage = {"X-App-Usage": json.dumps({"call_count": self.app_usage, "total_cputime": 0, "total_time": 0})}
+
+        if "access_token" not in query and "access_token" not in form:
+            return 400, {"error": {"message": "access_token fehlt", "code": 190}}, usage
+
+        if method == "POST" and len(segments) == 2 and segments[1] == "media":
+            creation_id = uuid.uuid4().hex[:16]
+            with self._lock:
+                self.containers[creation_id] = {"created": time.monotonic(), "video_url": form.get("video_url"), "user": segments[0]}
+            return 200, {"id": creation_id}, usage
+
+        if method == "POST" and len(segments) == 2 and segments[1] == "media_publish":
+            container = self.containers.get(form.get("creation_id"))
+            if container is None or time.monotonic() - container["created"] < self.processing_delay:
+                return 400, {"error": {"message": "Media ID is not available", "code": 9007}}, usage
+            media_id = uuid.uuid4().hex[:16]
+            with self._lock:
+                # Wie die echte API: ein Container lässt sich nur einmal veröffentlichen
+                if container.get("media_id"):
+                    return 400, {"error": {"message": "Media already published", "code": 9007}}, usage
+                container["media_id"] = media_id
+                self.published.append({"media_id": media_id, "creation_id": form["creation_id"], "user": segments[0]})
+            return 200, {"id": media_id}, usage
+
+        if method == "GET" and len(segments) == 1 and segments[0] in self.containers:
+            with self._lock:
+                self.status_polls += 1
+            container = self.containers[segments[0]]
+            done = time.monotonic() - container["created"] >= self.processing_delay
+            status = "PUBLISHED" if container.get("media_id") else "FINISHED" if done else "IN_PROGRESS"
+            return 200, {"status_code": status, "id": segments[0]}, usage
+
+        return 404, {"error": {"message": f"unbekannter Pfad {path}"}}, usage
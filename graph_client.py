@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import random
+import threading
+
+GRAPH_API_BASE = os.environ.get("GRAPH_API_BASE", "https://graph.facebook.com/v18.0")
+# Ab dieser Auslastung (Prozent laut X-App-Usage) wird gebremst
+USAGE_THROTTLE_PERCENT = 90
+# Container-Status, nach denen sich nichts mehr ändert
+FINAL_STATUSES = ("FINISHED", "PUBLISHED", "ERROR", "EXPIRED")
+
+class GraphAPIError(Exception):
+    pass
+
+# === Graph-API-Client mit Keep-Alive ===
+class GraphClient:
+    def __init__(self, user_id, access_token, base_url=GRAPH_API_BASE, pool_size=10, timeout=30):
+        self.user_id = user_id
+        self.access_token = access_token
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._session = None
+        self.usage = 0
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        # requests erst beim ersten Aufruf laden, das hält den Kaltstart der Flask-App klein
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+            return self._session
+
+    # === Rate-Limits ===
+    def _update_limits(self, res):
+        usage = 0
+        regain_minutes = 0
+        for header in ("X-App-Usage", "X-Business-Use-Case-Usage"):
+            raw = res.headers.get(header)
+            if not raw:
+                continue
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                continue
+            # BUC-Header: {"<id>": [{...}]}, App-Header: {...}
+            entries = [e for v in data.values() for e in v] if header == "X-Business-Use-Case-Usage" else [data]
+            for entry in entries:
+                usage = max(usage, *(entry.get(k, 0) for k in ("call_count", "total_cputime", "total_time")))
+                regain_minutes = max(regain_minutes, entry.get("estimated_time_to_regain_access", 0))
+
+        delay = 0.0
+        if res.status_code == 429 or regain_minutes:
+            delay = max(float(res.headers.get("Retry-After", 0) or 0), regain_minutes * 60, 5.0)
+        elif usage >= USAGE_THROTTLE_PERCENT:
+            # Je näher an 100 %, desto länger pausieren
+            delay = (usage - USAGE_THROTTLE_PERCENT + 1) * 2.0
+        with self._lock:
+            self.usage = usage
+            if delay:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+        if delay:
+            print(f"[WARN] Graph-API-Limit (Auslastung {usage}%) – pausiere {delay:.0f}s")
+
+    def _throttle(self):
+        wait = self._blocked_until - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+    def _request(self, method, path, retries=3, **kwargs):
+        params = kwargs.pop("params", {})
+        data = kwargs.pop("data", None)
+        for attempt in range(retries + 1):
+            self._throttle()
+            if data is not None:
+                res = self.session.request(method, f"{self.base_url}/{path}", params=params,
+                                           data={**data, "access_token": self.access_token}, timeout=self.timeout)
+            else:
+                res = self.session.request(method, f"{self.base_url}/{path}",
+                                           params={**params, "access_token": self.access_token}, timeout=self.timeout)
+            self._update_limits(res)
+            if res.status_code == 429 and attempt < retries:
+                continue
+            if res.status_code >= 400:
+                raise GraphAPIError(f"{method} {path} → {res.status_code}: {res.text}")
+            return res.json()
+
+    # === Endpunkte ===
+    def create_container(self, video_url, caption):
+        payload = {"media_type": "REELS", "video_url": video_url, "caption": caption}
+        return self._request("POST", f"{self.user_id}/media", data=payload)["id"]
+
+    def status(self, creation_id):
+        return self._request("GET", creation_id, params={"fields": "status_code"}).get("status_code")
+
+    def publish(self, creation_id):
+        return self._request("POST", f"{self.user_id}/media_publish", data={"creation_id": creation_id}).get("id")
+
+    # === Status-Polling mit Backoff ===
+    @staticmethod
+    def poll_delays(initial=1.0, factor=1.6, max_interval=15.0):
+        # Exponentieller Backoff mit Jitter: früh oft nachsehen, später seltener
+        delay = initial
+        while True:
+            yield random.uniform(delay * 0.5, delay)
+            delay = min(delay * factor, max_interval)
+
+    def wait_for_status(self, creation_id, max_wait=180):
+        # Endstatus des Containers; None, wenn er innerhalb von max_wait keinen erreicht
+        deadline = time.monotonic() + max_wait
+        for delay in self.poll_delays():
+            status = self.status(creation_id)
+            print(f"[DEBUG] Status für Creation {creation_id}: {status}")
+            if status in FINAL_STATUSES:
+                return status
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            time.sleep(min(delay, remaining))
+
+    def wait_until_ready(self, creation_id, max_wait=180):
+        return self.wait_for_status(creation_id, max_wait) == "FINISHED"
@@ -0,0 +1,77 @@
+import os
+import time
+import uuid
+import queue
+import threading
+import traceback
+from collections import OrderedDict
+
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 1))
+JOB_MAX_PENDING = int(os.environ.get("JOB_MAX_PENDING", 2))
+# Trigger innerhalb dieses Fensters landen beim bereits laufenden Job
+JOB_COALESCE_SECONDS = float(os.environ.get("JOB_COALESCE_SECONDS", 120))
+MAX_HISTORY = 100
+
+class QueueFull(Exception):
+    pass
+
+# === Begrenzte Job-Queue mit Zusammenfassung ===
+class JobQueue:
+    def __init__(self, target, workers=JOB_WORKERS, max_pending=JOB_MAX_PENDING, coalesce_seconds=JOB_COALESCE_SECONDS):
+        self.target = target
+        self.coalesce_seconds = coalesce_seconds
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        for i in range(workers):
+            threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True).start()
+
+    def _worker(self):
+        while True:
+            job, kwargs = self._queue.get()
+            job.update(started=time.time(), status="running")
+            print(f"[INFO] Job {job['id']} gestartet")
+            try:
+                self.target(**kwargs)
+                job["status"] = "done"
+            except Exception:
+                job.update(status="failed", error=traceback.format_exc())
+                print(f"[ERROR] Job {job['id']} fehlgeschlagen:\n{job['error']}")
+            job["finished"] = time.time()
+
+    def _find_coalescable(self, key, now):
+        for job in reversed(self._jobs.values()):
+            if job["key"] != key:
+                continue
+            if job["status"] == "queued":
+                return job
+            if job["status"] == "running" and now - job["started"] < self.coalesce_seconds:
+                return job
+        return None
+
+    def submit(self, key="post", **kwargs):
+        now = time.time()
+        with self._lock:
+            job = self._find_coalescable(key, now)
+            if job is not None:
+                job["coalesced"] += 1
+                return job, False
+
+            job = {"id": uuid.uuid4().hex[:12], "key": key, "status": "queued", "created": now,
+                   "started": None, "finished": None, "coalesced": 0, "error": None}
+            try:
+                self._queue.put_nowait((job, kwargs))
+            except queue.Full:
+                raise QueueFull(f"{self._queue.qsize()} Jobs warten bereits")
+            self._jobs[job["id"]] = job
+            while len(self._jobs) > MAX_HISTORY:
+                self._jobs.popitem(last=False)
+            return job, True
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def pending(self):
+        return self._queue.qsize()
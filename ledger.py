@@ -0,0 +1,253 @@
+import os
+import time
+import uuid
+import queue
+import sqlite3
+import threading
+import traceback
+
+LEDGER_PATH = os.environ.get("LEDGER_PATH", os.path.join("daily_tiktoks", "ledger.sqlite3"))
+# Schreibzugriffe innerhalb dieses Fensters landen in einer gemeinsamen Transaktion
+COMMIT_SECONDS = float(os.environ.get("LEDGER_COMMIT_SECONDS", 0.02))
+MAX_ATTEMPTS = int(os.environ.get("LEDGER_MAX_ATTEMPTS", 3))
+MAX_BATCH = 100
+
+# Ablauf eines Posts; "publishing" = Publish wurde abgeschickt, "failed" nach zu vielen Versuchen
+STAGES = ("created", "rendered", "uploaded", "container", "publishing", "published")
+FIELDS = ("equation", "video_path", "video_url", "creation_id", "media_id")
+# Je Konto beim Fan-out; "skipped" = Tagesbudget des Kontos erschöpft, wird beim nächsten Versuch neu geprüft
+TARGET_STAGES = ("pending", "container", "publishing", "published", "skipped")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    stage TEXT NOT NULL,
+    equation TEXT,
+    video_path TEXT,
+    video_url TEXT,
+    creation_id TEXT,
+    media_id TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_stage ON jobs (stage, created);
+CREATE TABLE IF NOT EXISTS targets (
+    job_id TEXT NOT NULL,
+    account TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    creation_id TEXT,
+    media_id TEXT,
+    error TEXT,
+    updated REAL NOT NULL,
+    PRIMARY KEY (job_id, account)
+);
+CREATE INDEX IF NOT EXISTS targets_account ON targets (account, stage, updated);
+"""
+
+class LedgerError(Exception):
+    pass
+
+class LedgerDeferred(LedgerError):
+    # Kein Fehlversuch: der Job bleibt auf seiner Stufe, bis es weitergehen kann
+    pass
+
+def recent_equations(since, path=LEDGER_PATH):
+    # Nur lesend und ohne Writer-Thread, z. B. für die Gleichungs-Historie
+    if not os.path.isfile(path):
+        return []
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        return conn.execute("SELECT equation, created FROM jobs WHERE created >= ? AND equation IS NOT NULL", (since,)).fetchall()
+    finally:
+        conn.close()
+
+# === Persistentes Job-Protokoll (SQLite, WAL) ===
+class Ledger:
+    def __init__(self, path=LEDGER_PATH, commit_seconds=COMMIT_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.commit_seconds = commit_seconds
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+        self._reader = self._connect()
+        self._read_lock = threading.Lock()
+        # Jobs, an denen in diesem Prozess gerade ein Worker arbeitet
+        self._claimed = set()
+        self._claim_lock = threading.Lock()
+        self._writes = queue.Queue()
+        threading.Thread(target=self._writer, name="ledger-writer", daemon=True).start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Mit WAL übersteht NORMAL jeden Prozessabsturz, nur ein Stromausfall kann den letzten Commit kosten
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # === Gruppen-Commit ===
+    def _writer(self):
+        conn = self._connect()
+        while True:
+            batch = [self._writes.get()]
+            deadline = time.monotonic() + self.commit_seconds
+            while len(batch) < MAX_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._writes.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            error = None
+            try:
+                with conn:
+                    for sql, params, _ in batch:
+                        conn.execute(sql, params)
+            except sqlite3.Error as e:
+                error = e
+            for _, _, done in batch:
+                done["error"] = error
+                done["event"].set()
+
+    def _write(self, sql, params):
+        # Kehrt erst zurück, wenn die Änderung committet ist
+        done = {"event": threading.Event(), "error": None}
+        self._writes.put((sql, params, done))
+        done["event"].wait()
+        if done["error"] is not None:
+            raise done["error"]
+
+    # === Lesen ===
+    def get(self, job_id):
+        with self._read_lock:
+            row = self._reader.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def unfinished(self):
+        with self._read_lock:
+            rows = self._reader.execute("SELECT * FROM jobs WHERE stage NOT IN ('published', 'failed') ORDER BY created").fetchall()
+        return [dict(r) for r in rows]
+
+    def next_unfinished(self):
+        jobs = self.unfinished()
+        return jobs[0] if jobs else None
+
+    def claim_next(self):
+        # Bei mehreren Workern bekommt jeder einen anderen unterbrochenen Job; run() gibt ihn wieder frei
+        with self._claim_lock:
+            for job in self.unfinished():
+                if job["id"] not in self._claimed:
+                    self._claimed.add(job["id"])
+                    return job
+        return None
+
+    def targets(self, job_id):
+        with self._read_lock:
+            rows = self._reader.execute("SELECT * FROM targets WHERE job_id = ?", (job_id,)).fetchall()
+        return {r["account"]: dict(r) for r in rows}
+
+    def published_since(self, account, since):
+        with self._read_lock:
+            row = self._reader.execute("SELECT COUNT(*) FROM targets WHERE account = ? AND stage = 'published' AND updated >= ?",
+                                       (account, since)).fetchone()
+        return row[0]
+
+    def counts(self):
+        with self._read_lock:
+            rows = self._reader.execute("SELECT stage, COUNT(*) FROM jobs GROUP BY stage").fetchall()
+        return {stage: count for stage, count in rows}
+
+    # === Übergänge ===
+    def start(self, equation=None):
+        now = time.time()
+        job = {"id": uuid.uuid4().hex[:12], "stage": "created", "equation": equation, "video_path": None, "video_url": None,
+               "creation_id": None, "media_id": None, "attempts": 0, "error": None, "created": now, "updated": now}
+        # Schon vor dem Insert beanspruchen, sonst könnte ein anderer Worker den neuen Job fortsetzen
+        with self._claim_lock:
+            self._claimed.add(job["id"])
+        self._write(f"INSERT INTO jobs ({', '.join(job)}) VALUES ({', '.join('?' * len(job))})", tuple(job.values()))
+        return job
+
+    def advance(self, job, stage, **fields):
+        unknown = set(fields) - set(FIELDS)
+        if stage not in STAGES or unknown:
+            raise LedgerError(f"Ungültiger Übergang: {stage} {sorted(unknown)}")
+        job.update(fields, stage=stage, updated=time.time())
+        assignments = ", ".join(f"{k} = ?" for k in ("stage", "updated", *fields))
+        self._write(f"UPDATE jobs SET {assignments} WHERE id = ?", (stage, job["updated"], *fields.values(), job["id"]))
+        print(f"[INFO] Job {job['id']}: {stage}")
+        return job
+
+    def advance_target(self, job_id, account, stage, creation_id=None, media_id=None, error=None):
+        if stage not in TARGET_STAGES:
+            raise LedgerError(f"Ungültiger Übergang: {stage}")
+        self._write("INSERT OR REPLACE INTO targets (job_id, account, stage, creation_id, media_id, error, updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", (job_id, account, stage, creation_id, media_id, error, time.time()))
+        print(f"[INFO] Job {job_id} → {account}: {stage}")
+
+    def fail(self, job, error):
+        job["attempts"] += 1
+        job["error"] = error
+        if job["attempts"] >= self.max_attempts:
+            job["stage"] = "failed"
+            print(f"[ERROR] Job {job['id']} nach {job['attempts']} Versuchen aufgegeben.")
+        job["updated"] = time.time()
+        self._write("UPDATE jobs SET stage = ?, attempts = ?, error = ?, updated = ? WHERE id = ?",
+                    (job["stage"], job["attempts"], error, job["updated"], job["id"]))
+        return job
+
+    # === Fortsetzen ab der letzten abgeschlossenen Stufe ===
+    def run(self, job, produce, upload, create_container=None, wait_status=None, publish=None, fan_out=None, until=None):
+        # produce(equation) liefert {"video_path": ...} oder – bei Render-Cache/Streaming – direkt {"video_url": ...};
+        # wait_status(creation_id) den Endstatus des Containers (None bei Zeitüberschreitung);
+        # fan_out(job) ersetzt Container/Publish, wenn an mehrere Konten gepostet wird;
+        # until ("rendered"/"uploaded"): nur bis dorthin; der Job bleibt beansprucht, bis ein späterer run() ihn abschließt
+        reached = lambda: until is not None and STAGES.index(job["stage"]) >= STAGES.index(until)
+        keep_claim = False
+        try:
+            if job["stage"] == "rendered" and not (job["video_path"] and os.path.isfile(job["video_path"])):
+                print(f"[WARN] Job {job['id']}: gerenderte Datei fehlt – rendere neu.")
+                job["stage"] = "created"
+            if job["stage"] == "created" and not reached():
+                produced = produce(job["equation"])
+                self.advance(job, "uploaded" if produced.get("video_url") else "rendered", **produced)
+            if job["stage"] == "rendered" and not reached():
+                self.advance(job, "uploaded", video_url=upload(job["video_path"]))
+            if reached():
+                keep_claim = True
+                return job
+            if job["stage"] == "uploaded" and fan_out is not None:
+                self.advance(job, "published", media_id=",".join(fan_out(job)))
+            if job["stage"] == "uploaded":
+                self.advance(job, "container", creation_id=create_container(job["video_url"]))
+            if job["stage"] in ("container", "publishing"):
+                creation_id = job["creation_id"]
+                status = wait_status(creation_id)
+                if status == "PUBLISHED":
+                    # Publish ging durch, die Antwort kam aber nie an (Timeout, Absturz): nicht noch einmal posten
+                    print(f"[WARN] Job {job['id']}: Container {creation_id} ist bereits veröffentlicht.")
+                    self.advance(job, "published")
+                elif status == "FINISHED":
+                    self.advance(job, "publishing")
+                    self.advance(job, "published", media_id=publish(creation_id))
+                elif job["stage"] == "publishing":
+                    # Nach einem Publish-Versuch nie einen neuen Container anlegen, sonst droht ein Doppelpost
+                    raise LedgerError(f"Media {creation_id} nach Publish-Versuch im Status {status}")
+                else:
+                    # Abgelaufenen/fehlerhaften Container nicht erneut abwarten, beim nächsten Versuch neu anlegen
+                    self.advance(job, "uploaded", creation_id=None)
+                    raise LedgerError(f"Media {creation_id} nicht bereit ({status})")
+        except LedgerDeferred:
+            raise
+        except Exception:
+            self.fail(job, traceback.format_exc())
+            raise
+        finally:
+            if not keep_claim:
+                with self._claim_lock:
+                    self._claimed.discard(job["id"])
+        return job
@@ -0,0 +1,128 @@
+import os
+import time
+import uuid
+import datetime
+from encode_profiles import get_profile, x264_extra_params
+import metrics
+
+OUTPUT_FOLDER = "daily_tiktoks"
+TEMPLATE_PATH = os.path.join(OUTPUT_FOLDER, "Vorlage.mp4")
+os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+
+ENCODE_PROFILE, _encode = get_profile()
+# "raw" blendet das Overlay direkt in die Frames, "moviepy" nutzt CompositeVideoClip,
+# "concat" kodiert nur die Overlay-Frames neu und hängt den vorkodierten Rest per Stream-Copy an,
+# "stream" dekodiert die Vorlage Frame für Frame ohne Vorlagen-Cache (für Instanzen mit wenig RAM)
+RENDER_ENGINE = os.environ.get("RENDER_ENGINE", "raw")
+# Wie lange die Gleichung sichtbar ist; leer = ganze Cliplänge
+OVERLAY_SECONDS = float(os.environ["OVERLAY_SECONDS"]) if os.environ.get("OVERLAY_SECONDS") else None
+
+# Alles, was das fertige Video beeinflusst (auch Teil des Render-Cache-Schlüssels)
+RENDER_SETTINGS = {
+    "height": 1080,
+    "duration": 3,
+    "codec": "libx264",
+    # Die Engines liefern nicht bitgleiche Dateien (z. B. lanczos-Skalierung bei "stream")
+    "engine": RENDER_ENGINE,
+    "profile": ENCODE_PROFILE,
+    **_encode,
+    "text_height": 200,
+    "font_size": 55,
+    "overlay_seconds": OVERLAY_SECONDS,
+}
+
+# === Equation Generator ===
+def generate_equation_variant():
+    # Vorberechneter Index aller Varianten; keine Wiederholung innerhalb von EQUATION_HISTORY_DAYS
+    from equation_index import default_index
+    return default_index().draw()
+
+# === Text to Image ===
+def create_text_image(text, width, height):
+    from text_render import text_overlay
+    with metrics.span("text_image"):
+        return text_overlay(text, width, height, size=RENDER_SETTINGS["font_size"])
+
+# === Video erstellen ===
+def overlay_frame_count(n_frames):
+    seconds = RENDER_SETTINGS["overlay_seconds"]
+    if seconds is None:
+        return None
+    return min(n_frames, max(1, int(round(seconds * RENDER_SETTINGS["fps"]))))
+
+def unique_video_filename():
+    # Sekunden allein reichen nicht: parallele Renderer enden oft in derselben Sekunde
+    return os.path.join(OUTPUT_FOLDER, f"{datetime.date.today()}_{int(time.time())}_{uuid.uuid4().hex[:8]}_math_video.mp4")
+
+def create_math_video(equation=None):
+    # Render-Stack (NumPy, imageio, moviepy) erst hier laden, damit die Flask-App ohne ihn startet
+    from raw_compositor import render_raw
+    from segment_render import render_concat
+    from template_cache import template_clip, get_template_frames
+
+    equation = equation or generate_equation_variant()
+    print(f"[INFO] Generierte Gleichung: {equation}")
+
+    template_path = TEMPLATE_PATH
+    if not os.path.isfile(template_path):
+        raise FileNotFoundError(f"Vorlage.mp4 nicht gefunden unter: {template_path}")
+
+    filename = unique_video_filename()
+    cfg = RENDER_SETTINGS
+    encode = {"preset": cfg["preset"], "threads": cfg["threads"], "crf": cfg["crf"], "gop": cfg["gop"], "tune": cfg["tune"]}
+    if RENDER_ENGINE == "stream":
+        from stream_render import render_stream, output_size
+        width, _ = output_size(template_path, cfg["height"])
+        text_np = create_text_image(equation, width, cfg["text_height"])
+        with metrics.span("encode"):
+            _, peak_rss = render_stream(template_path, text_np, filename, height=cfg["height"], duration=cfg["duration"], fps=cfg["fps"],
+                                        codec=cfg["codec"], overlay_frames=overlay_frame_count(int(round(cfg["duration"] * cfg["fps"]))),
+                                        **encode)
+        print(f"[INFO] Spitzen-RSS beim Rendern: {peak_rss // (1024 * 1024)} MB")
+        metrics.annotate(peak_rss_bytes=peak_rss)
+    elif RENDER_ENGINE in ("raw", "concat"):
+        with metrics.span("template_load"):
+            frames = get_template_frames(template_path, height=cfg["height"], duration=cfg["duration"], fps=cfg["fps"])
+        text_np = create_text_image(equation, frames.shape[2], cfg["text_height"])
+        overlay_frames = overlay_frame_count(len(frames))
+        with metrics.span("encode"):
+            if RENDER_ENGINE == "concat":
+                render_concat(template_path, frames, text_np, filename, overlay_frames, fps=cfg["fps"], codec=cfg["codec"], **encode)
+            else:
+                render_raw(frames, text_np, filename, fps=cfg["fps"], codec=cfg["codec"], overlay_frames=overlay_frames, **encode)
+    else:
+        from moviepy.editor import ImageClip, CompositeVideoClip
+        with metrics.span("template_load"):
+            clip = template_clip(template_path, height=cfg["height"], duration=cfg["duration"], fps=cfg["fps"])
+        text_np = create_text_image(equation, clip.w, cfg["text_height"])
+        overlay_frames = overlay_frame_count(int(round(clip.duration * cfg["fps"])))
+        text_duration = clip.duration if overlay_frames is None else overlay_frames / cfg["fps"]
+        text_clip = ImageClip(text_np, duration=text_duration).set_position("center")
+        final = CompositeVideoClip([clip, text_clip])
+        try:
+            with metrics.span("encode"):
+                final.write_videofile(filename, codec=cfg["codec"], audio=False, fps=cfg["fps"], preset=cfg["preset"], threads=cfg["threads"],
+                                      ffmpeg_params=x264_extra_params(cfg["crf"], cfg["gop"], cfg["tune"]))
+        finally:
+            final.close()
+            text_clip.close()
+    metrics.annotate(equation=equation, file=filename)
+
+    print(f"[INFO] Video gespeichert: {filename}")
+    return filename
+
+# === Vorwärmen ===
+def warm_up():
+    # Render-Stack, Vorlage und Glyphen laden, damit der erste Post nicht dafür bezahlt
+    from template_cache import get_template_frames
+    import segment_render
+    cfg = RENDER_SETTINGS
+    if RENDER_ENGINE == "stream":
+        # Kein Vorlagen-Cache: der stream-Modus soll genau diesen Speicher sparen
+        from stream_render import output_size
+        create_text_image("0", output_size(TEMPLATE_PATH, cfg["height"])[0], cfg["text_height"])
+        return
+    frames = get_template_frames(TEMPLATE_PATH, height=cfg["height"], duration=cfg["duration"], fps=cfg["fps"])
+    create_text_image("0", frames.shape[2], cfg["text_height"])
+    if RENDER_ENGINE == "moviepy":
+        import moviepy.editor
@@ -0,0 +1,121 @@
+import os
+import time
+import uuid
+import threading
+import contextlib
+from collections import deque
+
+# Sekunden-Grenzen der Histogramme, grob von Text-Rendering bis Graph-API-Wartezeit
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+MAX_RUNS = int(os.environ.get("METRICS_MAX_RUNS", 50))
+
+_lock = threading.Lock()
+_histograms = {}
+_run_totals = {}
+_runs = deque(maxlen=MAX_RUNS)
+_local = threading.local()
+
+# === Histogramm ===
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+def observe(stage, seconds):
+    with _lock:
+        _histograms.setdefault(stage, Histogram()).observe(seconds)
+
+# === Spans und Läufe ===
+@contextlib.contextmanager
+def span(stage):
+    start = time.perf_counter()
+    ok = True
+    try:
+        yield
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        observe(stage, seconds)
+        current = getattr(_local, "run", None)
+        if current is not None:
+            current["spans"].append({"stage": stage, "seconds": round(seconds, 4), "ok": ok})
+
+@contextlib.contextmanager
+def run(kind="post"):
+    record = {"id": uuid.uuid4().hex[:12], "kind": kind, "started": time.time(), "spans": [], "status": "running"}
+    previous = getattr(_local, "run", None)
+    _local.run = record
+    with _lock:
+        _runs.append(record)
+    start = time.perf_counter()
+    try:
+        yield record
+        record["status"] = "ok"
+    except BaseException as e:
+        record["status"] = "error"
+        record["error"] = repr(e)
+        raise
+    finally:
+        record["seconds"] = round(time.perf_counter() - start, 4)
+        _local.run = previous
+        with _lock:
+            key = (kind, record["status"])
+            _run_totals[key] = _run_totals.get(key, 0) + 1
+
+def bind(fn):
+    # Für Threadpools: Spans aus dem Worker-Thread landen im Lauf des aufrufenden Threads
+    record = getattr(_local, "run", None)
+
+    def wrapper(*args, **kwargs):
+        previous = getattr(_local, "run", None)
+        _local.run = record
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.run = previous
+    return wrapper
+
+def annotate(**info):
+    current = getattr(_local, "run", None)
+    if current is not None:
+        current.update(info)
+
+def recent_runs():
+    with _lock:
+        return list(reversed(_runs))
+
+# === Prometheus-Textformat ===
+def _fmt(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render_prometheus(gauges=None, counters=None):
+    lines = [
+        "# HELP poster_stage_seconds Dauer der einzelnen Pipeline-Stufen.",
+        "# TYPE poster_stage_seconds histogram",
+    ]
+    with _lock:
+        for stage, h in sorted(_histograms.items()):
+            for bound, count in zip(BUCKETS, h.counts):
+                lines.append(f'poster_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'poster_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+            lines.append(f'poster_stage_seconds_sum{{stage="{stage}"}} {_fmt(h.sum)}')
+            lines.append(f'poster_stage_seconds_count{{stage="{stage}"}} {h.count}')
+        lines += ["# HELP poster_runs_total Abgeschlossene Läufe nach Art und Status.", "# TYPE poster_runs_total counter"]
+        for (kind, status), count in sorted(_run_totals.items()):
+            lines.append(f'poster_runs_total{{kind="{kind}",status="{status}"}} {count}')
+    for name, value in (gauges or {}).items():
+        lines += [f"# TYPE {name} gauge", f"{name} {_fmt(value)}"]
+    # Nur steigende Werte seit Prozessstart; Namen enden auf _total
+    for name, value in (counters or {}).items():
+        lines += [f"# TYPE {name} counter", f"{name} {_fmt(value)}"]
+    return "\n".join(lines) + "\n"
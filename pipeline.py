@@ -0,0 +1,89 @@
+import sys
+import time
+import queue
+import threading
+import traceback
+
+_STOP = object()
+
+# === Gestaffelte Pipeline: Render → Upload → Publish ===
+class Pipeline:
+    def __init__(self, render, upload, publish, queue_size=2):
+        # Jede Stufe bekommt und liefert einen Job aus dem Protokoll: render(equation) legt ihn an,
+        # upload(job) und publish(job) setzen ihn fort (app.post_many: PostRunner.run mit until)
+        self._render = render
+        self._upload = upload
+        self._publish = publish
+
+        # Begrenzte Queues: ein langsamer Publish bremst das Rendern, statt Videos anzustauen
+        self._render_q = queue.Queue(maxsize=queue_size)
+        self._upload_q = queue.Queue(maxsize=queue_size)
+        self._publish_q = queue.Queue(maxsize=queue_size)
+        self.results = []
+        self._results_lock = threading.Lock()
+        self._counter = 0
+
+        self._threads = [
+            threading.Thread(target=self._run_stage, args=("render", self._render_stage, self._render_q, self._upload_q), daemon=True),
+            threading.Thread(target=self._run_stage, args=("upload", self._upload_stage, self._upload_q, self._publish_q), daemon=True),
+            threading.Thread(target=self._run_stage, args=("publish", self._publish_stage, self._publish_q, None), daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+
+    # === Stufen ===
+    def _render_stage(self, item):
+        item["job"] = self._render(item["equation"])
+
+    def _upload_stage(self, item):
+        item["job"] = self._upload(item["job"])
+
+    def _publish_stage(self, item):
+        item["job"] = self._publish(item["job"])
+
+    def _run_stage(self, name, fn, in_q, out_q):
+        while True:
+            item = in_q.get()
+            if item is _STOP:
+                if out_q is not None:
+                    out_q.put(_STOP)
+                return
+            if "error" not in item:
+                start = time.perf_counter()
+                try:
+                    fn(item)
+                except Exception:
+                    item["error"] = f"{name}: {traceback.format_exc()}"
+                    print(f"[ERROR] Job {item['id']} in Stufe {name} fehlgeschlagen:\n{traceback.format_exc()}")
+                item["timings"].setdefault(name, time.perf_counter() - start)
+                print(f"[INFO] Job {item['id']} {name}: {item['timings'][name]:.2f}s")
+            if out_q is not None:
+                out_q.put(item)
+            else:
+                self._finish(item)
+
+    def _finish(self, item):
+        item["timings"]["total"] = time.perf_counter() - item["submitted"]
+        with self._results_lock:
+            self.results.append(item)
+        stages = ", ".join(f"{k}={v:.2f}s" for k, v in item["timings"].items())
+        status = "❌" if "error" in item else "✅"
+        print(f"[INFO] {status} Job {item['id']} fertig: {stages}")
+
+    # === API ===
+    def submit(self, equation=None):
+        self._counter += 1
+        item = {"id": self._counter, "equation": equation, "submitted": time.perf_counter(), "timings": {}}
+        self._render_q.put(item)
+        return item["id"]
+
+    def close(self):
+        self._render_q.put(_STOP)
+        for t in self._threads:
+            t.join()
+        return self.results
+
+if __name__ == "__main__":
+    import app
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    app.post_many(n)
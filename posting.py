@@ -0,0 +1,81 @@
+import metrics
+import retention
+import scheduler
+from ledger import LedgerDeferred
+from prerender_queue import take_next_item
+
+DEFAULT_CAPTION = "Can you solve this? #math #reel #puzzle"
+
+# === Ein Post mit Protokoll, gemeinsam für app.py und instagramSpeicherung.py ===
+class PostRunner:
+    def __init__(self, ledger, graph, render, upload, generate_equation, accounts=None, caption=DEFAULT_CAPTION, max_wait=180):
+        # render(equation) liefert {"video_path": ...} oder {"video_url": ...}, wenn kein vorgerendertes Video bereitliegt;
+        # generate_equation() wird nur dann gefragt, sonst verbraucht jeder Post eine Gleichung aus der Historie;
+        # accounts: AccountRegistry; ohne wird nur über graph gepostet, ohne Tagesbudget
+        self.ledger = ledger
+        self.graph = graph
+        self.render = render
+        self.upload = upload
+        self.generate_equation = generate_equation
+        self.accounts = accounts
+        self.caption = caption
+        self.max_wait = max_wait
+
+    def produce(self, equation):
+        item = take_next_item()
+        if item is not None:
+            return {"video_path": item["file"], "equation": item["equation"]}
+        equation = equation or self.generate_equation()
+        return {"equation": equation, **self.render(equation)}
+
+    def create_container(self, video_url):
+        print("[INFO] Sende Video an Instagram...")
+        with metrics.span("container_create"):
+            return self.graph.create_container(video_url, self.caption)
+
+    def wait_status(self, creation_id):
+        with metrics.span("media_ready_wait"):
+            return self.graph.wait_for_status(creation_id, self.max_wait)
+
+    def publish(self, creation_id, publish_at=None):
+        scheduler.wait_for_slot(publish_at)
+        with metrics.span("publish"):
+            media_id = self.graph.publish(creation_id)
+        metrics.annotate(media_id=media_id)
+        return media_id
+
+    def run(self, job, publish_at=None, until=None):
+        fan_out = None
+        if self.accounts is not None:
+            # Auch bei nur einem Konto über die Konten: Ziele im Protokoll, Tagesbudget geprüft;
+            # mehrere Konten bekommen dasselbe einmal gerenderte und hochgeladene Video
+            fan_out = lambda job: self.accounts.fan_out(job, publish_at)
+        job = self.ledger.run(
+            job,
+            produce=self.produce,
+            upload=self.upload,
+            create_container=self.create_container,
+            wait_status=self.wait_status,
+            publish=lambda creation_id: self.publish(creation_id, publish_at),
+            fan_out=fan_out,
+            until=until,
+        )
+        if job["stage"] == "published":
+            retention.mark_published(job["video_url"], job["media_id"])
+            print("[INFO] ✅ Reel gepostet.")
+        return job
+
+    def post(self, publish_at=None):
+        # Unterbrochenen Post zuerst abschließen statt einen neuen zu beginnen
+        job = self.ledger.claim_next()
+        if job is not None:
+            print(f"[INFO] Setze Job {job['id']} ab Stufe '{job['stage']}' fort.")
+        else:
+            # Gleichung erst in produce(): ein vorgerendertes Video bringt seine eigene mit
+            job = self.ledger.start()
+        metrics.annotate(job_id=job["id"])
+        try:
+            return self.run(job, publish_at)
+        except LedgerDeferred as e:
+            print(f"[WARN] Job {job['id']} zurückgestellt: {e}")
+            return job
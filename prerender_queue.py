@@ -0,0 +1,76 @@
+import os
+import json
+import time
+import uuid
+import threading
+
+QUEUE_FOLDER = os.path.join("daily_tiktoks", "queue")
+MANIFEST_PATH = os.path.join(QUEUE_FOLDER, "manifest.json")
+PRERENDER_COUNT = int(os.environ.get("PRERENDER_COUNT", 10))
+
+_lock = threading.Lock()
+_fill_lock = threading.Lock()
+
+# === Manifest ===
+def _load_manifest():
+    try:
+        with open(MANIFEST_PATH, encoding="utf-8") as f:
+            items = json.load(f).get("items", [])
+    except (OSError, ValueError):
+        return []
+    # Einträge ohne Datei (z. B. manuell gelöscht) ignorieren
+    return [item for item in items if os.path.isfile(item["file"])]
+
+def _save_manifest(items):
+    os.makedirs(QUEUE_FOLDER, exist_ok=True)
+    tmp_path = f"{MANIFEST_PATH}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"items": items}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+def ready_count():
+    with _lock:
+        return len(_load_manifest())
+
+def queued_equations():
+    with _lock:
+        return [item["equation"] for item in _load_manifest()]
+
+# === Vorrendern ===
+def fill_queue(render_fn, generate_fn, target=PRERENDER_COUNT):
+    # Läuft schon ein Füllvorgang, nicht doppelt rendern
+    if not _fill_lock.acquire(blocking=False):
+        print("[INFO] Vorrendern läuft bereits.")
+        return 0
+    try:
+        os.makedirs(QUEUE_FOLDER, exist_ok=True)
+        rendered = 0
+        while ready_count() < target:
+            equation = generate_fn()
+            video_path = render_fn(equation)
+            item_id = uuid.uuid4().hex[:12]
+            queued_path = os.path.join(QUEUE_FOLDER, f"{item_id}_{os.path.basename(video_path)}")
+            os.replace(video_path, queued_path)
+            with _lock:
+                items = _load_manifest()
+                items.append({"id": item_id, "file": queued_path, "equation": equation, "created": time.time()})
+                _save_manifest(items)
+            rendered += 1
+            print(f"[INFO] Vorgerendert ({len(items)}/{target}): {equation}")
+        return rendered
+    finally:
+        _fill_lock.release()
+
+def take_next_item():
+    with _lock:
+        items = _load_manifest()
+        if not items:
+            return None
+        item = items.pop(0)
+        # Aus queue/ herausnehmen: ab jetzt gilt das Video als gerendert und fällt unter die Aufbewahrungsregeln
+        taken_path = os.path.join(os.path.dirname(QUEUE_FOLDER), os.path.basename(item["file"]))
+        os.replace(item["file"], taken_path)
+        item["file"] = taken_path
+        _save_manifest(items)
+    print(f"[INFO] Nutze vorgerendertes Video: {item['file']} ({item['equation']})")
+    return item
@@ -0,0 +1,95 @@
+import subprocess
+import numpy as np
+import imageio_ffmpeg
+from encode_profiles import x264_params
+
+# === Overlay vorbereiten ===
+class Overlay:
+    def __init__(self, text_np, frame_w, frame_h):
+        hi, wi = text_np.shape[:2]
+        # Gleiche Positionierung wie set_position("center") in moviepy
+        xp, yp = int((frame_w - wi) / 2), int((frame_h - hi) / 2)
+
+        # Nur der Bereich mit Alpha > 0 verändert Pixel, Rest bleibt exakt erhalten
+        rows = np.flatnonzero(text_np[:, :, 3].any(axis=1))
+        cols = np.flatnonzero(text_np[:, :, 3].any(axis=0))
+        if len(rows) == 0:
+            self.box = None
+            return
+        y1, y2 = max(rows[0], -yp), min(rows[-1] + 1, frame_h - yp)
+        x1, x2 = max(cols[0], -xp), min(cols[-1] + 1, frame_w - xp)
+        if y1 >= y2 or x1 >= x2:
+            self.box = None
+            return
+        self.box = (yp + y1, yp + y2, xp + x1, xp + x2)
+
+        # Exakt die Arithmetik aus moviepy.video.tools.drawing.blit
+        mask = 1.0 * text_np[y1:y2, x1:x2, 3] / 255
+        mask = np.dstack(3 * [mask])
+        self.premult = 1.0 * mask * text_np[y1:y2, x1:x2, :3]
+        self.inv_mask = 1.0 - mask
+        self._tmp = np.empty_like(self.premult)
+
+    def blend_into(self, frame):
+        if self.box is None:
+            return frame
+        y0, y1, x0, x1 = self.box
+        region = frame[y0:y1, x0:x1]
+        np.multiply(self.inv_mask, region, out=self._tmp)
+        self._tmp += self.premult
+        region[...] = self._tmp
+        return frame
+
+# === Frames direkt an ffmpeg übergeben ===
+def _pix_fmt_out(width, height):
+    # moviepy setzt yuv420p nur bei geraden Maßen, sonst wählt x264 yuv444p
+    return "yuv420p" if width % 2 == 0 and height % 2 == 0 else "yuv444p"
+
+def open_writer(filename, width, height, fps=24, codec="libx264", preset="ultrafast", threads=2, crf=None, gop=None, tune=None):
+    writer = imageio_ffmpeg.write_frames(
+        filename, (width, height), fps=fps, codec=codec,
+        pix_fmt_out=_pix_fmt_out(width, height),
+        quality=None, macro_block_size=1, ffmpeg_log_level="error",
+        output_params=x264_params(preset, threads, crf, gop, tune),
+    )
+    writer.send(None)
+    return writer
+
+def encoder_command(width, height, fps=24, codec="libx264", preset="ultrafast", threads=2, crf=None, gop=None, tune=None):
+    # RGB-Frames über stdin; Ausgabeziel hängt der Aufrufer an
+    return [
+        imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-vcodec", "rawvideo", "-s", f"{width}x{height}",
+        "-pix_fmt", "rgb24", "-r", f"{fps:.02f}", "-i", "-", "-an",
+        "-vcodec", codec, "-pix_fmt", _pix_fmt_out(width, height),
+        *x264_params(preset, threads, crf, gop, tune),
+    ]
+
+def open_stream_encoder(width, height, fps=24, codec="libx264", preset="ultrafast", threads=2, crf=None, gop=None, tune=None):
+    # Fragmentiertes MP4: der moov-Atom steht vorne, ffmpeg muss am Ende nicht zurückspringen
+    cmd = encoder_command(width, height, fps, codec, preset, threads, crf, gop, tune) + [
+        "-movflags", "frag_keyframe+empty_moov+default_base_moof",
+        "-f", "mp4", "pipe:1",
+    ]
+    return subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+def iter_composited(frames, text_np, overlay_frames=None):
+    # Nur die ersten overlay_frames Frames tragen den Text, danach läuft die Vorlage unverändert
+    n, height, width = frames.shape[:3]
+    overlay = Overlay(text_np, width, height)
+    limit = n if overlay_frames is None else overlay_frames
+    buf = np.empty((height, width, 3), dtype=np.uint8)
+    for i in range(n):
+        buf[...] = frames[i]
+        yield overlay.blend_into(buf) if i < limit else buf
+
+def render_raw(frames, text_np, filename, fps=24, codec="libx264", preset="ultrafast", threads=2, crf=None, gop=None, tune=None,
+               overlay_frames=None):
+    height, width = frames.shape[1:3]
+    writer = open_writer(filename, width, height, fps=fps, codec=codec, preset=preset, threads=threads, crf=crf, gop=gop, tune=tune)
+    try:
+        for frame in iter_composited(frames, text_np, overlay_frames):
+            writer.send(frame)
+    finally:
+        writer.close()
+    return filename
@@ -0,0 +1,63 @@
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from math_video import TEMPLATE_PATH, RENDER_SETTINGS, create_math_video, warm_up
+from equation_index import default_index
+from template_cache import get_template_frames
+
+# === Worker ===
+def _init_worker():
+    # Vorlage und Font einmal pro Prozess laden, nicht pro Video
+    warm_up()
+
+def _render_one(equation):
+    start, cpu_start = time.perf_counter(), time.process_time()
+    filename = create_math_video(equation)
+    return {
+        "file": filename,
+        "equation": equation,
+        "pid": os.getpid(),
+        "seconds": time.perf_counter() - start,
+        "cpu_seconds": time.process_time() - cpu_start,
+        "bytes": os.path.getsize(filename),
+    }
+
+# === Batch ===
+def render_batch(n, workers=None, equations=None):
+    equations = list(equations) if equations is not None else default_index().batch(n)
+    workers = workers or os.cpu_count() or 1
+
+    # Cache-Datei im Elternprozess anlegen, damit die Worker nicht parallel dekodieren
+    cfg = RENDER_SETTINGS
+    get_template_frames(TEMPLATE_PATH, height=cfg["height"], duration=cfg["duration"], fps=cfg["fps"])
+
+    results = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(_render_one, eq) for eq in equations]
+        for future in as_completed(futures):
+            res = future.result()
+            results.append(res)
+            print(f"[INFO] [{len(results)}/{len(equations)}] {res['file']} in {res['seconds']:.2f}s "
+                  f"(CPU {res['cpu_seconds']:.2f}s, PID {res['pid']})")
+    wall = time.perf_counter() - start
+
+    summary = {
+        "videos": len(results),
+        "workers": workers,
+        "wall_seconds": wall,
+        "videos_per_minute": 60 * len(results) / wall if wall else 0.0,
+        "mean_seconds": sum(r["seconds"] for r in results) / len(results) if results else 0.0,
+        "total_bytes": sum(r["bytes"] for r in results),
+    }
+    print(f"[INFO] {summary['videos']} Videos mit {workers} Workern in {wall:.1f}s "
+          f"→ {summary['videos_per_minute']:.1f} Videos/Minute, Ø {summary['mean_seconds']:.2f}s pro Video")
+    return results, summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rendert mehrere Mathe-Reels parallel.")
+    parser.add_argument("n", type=int, help="Anzahl Videos")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Anzahl Prozesse (Standard: CPU-Kerne)")
+    args = parser.parse_args()
+    render_batch(args.n, workers=args.workers)
@@ -0,0 +1,124 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from math_video import OUTPUT_FOLDER, TEMPLATE_PATH, RENDER_SETTINGS
+
+CACHE_FOLDER = os.path.join(OUTPUT_FOLDER, "cache")
+INDEX_PATH = os.path.join(CACHE_FOLDER, "index.json")
+# Obergrenze für lokal gecachte MP4s; ältest genutzte fliegen zuerst raus
+MAX_BYTES = int(os.environ.get("RENDER_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+
+_lock = threading.Lock()
+_template_hash = {}
+stats = {"hits": 0, "file_hits": 0, "misses": 0, "evictions": 0}
+
+# === Schlüssel ===
+def _template_fingerprint(path=TEMPLATE_PATH):
+    # Inhalts-Hash statt mtime: ein Redeploy setzt die mtime neu, der Inhalt bleibt gleich
+    st = os.stat(path)
+    stamp = (st.st_size, st.st_mtime_ns)
+    cached = _template_hash.get(path)
+    if cached is None or cached[0] != stamp:
+        with open(path, "rb") as f:
+            cached = (stamp, hashlib.sha256(f.read()).hexdigest())
+        _template_hash[path] = cached
+    return cached[1]
+
+def _font_fingerprint():
+    from text_render import load_font
+    font = load_font(RENDER_SETTINGS["font_size"])
+    return [os.path.basename(getattr(font, "path", "") or "default"), RENDER_SETTINGS["font_size"]]
+
+def cache_key(equation):
+    material = {
+        "equation": equation,
+        "template": _template_fingerprint(),
+        "font": _font_fingerprint(),
+        "settings": RENDER_SETTINGS,
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True, ensure_ascii=False).encode()).hexdigest()[:32]
+
+# === Index ===
+def _load_index():
+    try:
+        with open(INDEX_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_index(index):
+    os.makedirs(CACHE_FOLDER, exist_ok=True)
+    tmp_path = f"{INDEX_PATH}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, INDEX_PATH)
+
+def _evict(index, max_bytes):
+    files = sorted((e for e in index.values() if e.get("file") and os.path.isfile(e["file"])),
+                   key=lambda e: e["last_used"])
+    total = sum(e["bytes"] for e in files)
+    for entry in files:
+        if total <= max_bytes:
+            break
+        os.remove(entry["file"])
+        total -= entry["bytes"]
+        # URL bleibt gültig, nur die lokale Kopie ist weg
+        entry["file"] = None
+        stats["evictions"] += 1
+
+def cache_stats():
+    with _lock:
+        index = _load_index()
+    files = [e for e in index.values() if e.get("file") and os.path.isfile(e["file"])]
+    lookups = stats["hits"] + stats["file_hits"] + stats["misses"]
+    return {
+        **stats,
+        "entries": len(index),
+        "local_files": len(files),
+        "local_bytes": sum(e["bytes"] for e in files),
+        "hit_rate": (stats["hits"] + stats["file_hits"]) / lookups if lookups else 0.0,
+    }
+
+# === Nachschlagen oder erzeugen ===
+def get_or_create_url(equation, render_fn, upload_fn, max_bytes=MAX_BYTES):
+    key = cache_key(equation)
+    with _lock:
+        index = _load_index()
+        entry = index.get(key)
+        if entry and entry.get("url"):
+            stats["hits"] += 1
+            entry["last_used"] = time.time()
+            _save_index(index)
+            print(f"[INFO] Render-Cache-Treffer für '{equation}' → {entry['url']}")
+            return entry["url"]
+
+    if entry and entry.get("file") and os.path.isfile(entry["file"]):
+        stats["file_hits"] += 1
+        path = entry["file"]
+    else:
+        stats["misses"] += 1
+        os.makedirs(CACHE_FOLDER, exist_ok=True)
+        path = os.path.join(CACHE_FOLDER, f"{key}.mp4")
+        os.replace(render_fn(equation), path)
+
+    size = os.path.getsize(path)
+    url = upload_fn(path)
+    with _lock:
+        index = _load_index()
+        index[key] = {
+            "equation": equation,
+            # Nach dem Upload kann die Retention die lokale Datei schon gelöscht haben
+            "file": path if os.path.isfile(path) else None,
+            "bytes": size,
+            "url": url,
+            "created": index.get(key, {}).get("created", time.time()),
+            "last_used": time.time(),
+        }
+        _evict(index, max_bytes)
+        _save_index(index)
+    s = cache_stats()
+    print(f"[INFO] Render-Cache: {s['hits']} Treffer, {s['file_hits']} Datei-Treffer, {s['misses']} Fehlschläge, "
+          f"{s['local_files']} Dateien / {s['local_bytes'] // 1024} KB")
+    return url
@@ -0,0 +1,147 @@
+import os
+import json
+import time
+import shutil
+import threading
+from math_video import OUTPUT_FOLDER, TEMPLATE_PATH
+
+STATE_PATH = os.path.join(OUTPUT_FOLDER, "retention.json")
+MAX_BYTES = int(os.environ.get("RETENTION_MAX_BYTES", 500 * 1024 * 1024))
+MAX_AGE_HOURS = float(os.environ.get("RETENTION_MAX_AGE_HOURS", 48))
+DELETE_AFTER_UPLOAD = os.environ.get("RETENTION_DELETE_AFTER_UPLOAD", "1") == "1"
+
+# Lebenszyklus einer Datei: rendered → uploaded → published (danach ggf. deleted)
+STATES = ("rendered", "uploaded", "published")
+
+_lock = threading.Lock()
+deleted = {"count": 0, "bytes": 0}
+
+# === Zustandsdatei ===
+def _load_state():
+    try:
+        with open(STATE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_state(state):
+    tmp_path = f"{STATE_PATH}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, STATE_PATH)
+
+def _key(path):
+    return os.path.relpath(path)
+
+def _protected(path):
+    # Vorlage, vorkodierte Vorlagen-Segmente und vorgerenderte, noch nicht gepostete Videos nie löschen;
+    # den Render-Cache räumt render_cache selbst nach zuletzt genutzt auf
+    return (os.path.abspath(path) == os.path.abspath(TEMPLATE_PATH)
+            or os.path.basename(os.path.dirname(os.path.abspath(path))) in ("queue", "segments", "cache"))
+
+def _delete(path, state, reason):
+    if _protected(path):
+        return False
+    try:
+        size = os.path.getsize(path)
+        os.remove(path)
+    except OSError:
+        return False
+    deleted["count"] += 1
+    deleted["bytes"] += size
+    entry = state.setdefault(_key(path), {"state": "rendered"})
+    entry["deleted_at"] = time.time()
+    print(f"[INFO] Gelöscht ({reason}): {path}")
+    return True
+
+# === Übergänge ===
+# Unbekannte Dateien gelten als "rendered"
+def mark(path, new_state, **info):
+    with _lock:
+        state = _load_state()
+        entry = state.setdefault(_key(path), {})
+        entry.update(info, state=new_state, updated=time.time())
+        _save_state(state)
+
+def mark_uploaded(path, upload_result):
+    mark(path, "uploaded", url=upload_result.get("secure_url"))
+    # Nur löschen, wenn Cloudinary die volle Dateigröße bestätigt
+    if (DELETE_AFTER_UPLOAD and upload_result.get("secure_url") and os.path.isfile(path)
+            and upload_result.get("bytes") == os.path.getsize(path)):
+        with _lock:
+            state = _load_state()
+            _delete(path, state, "hochgeladen")
+            _save_state(state)
+
+def mark_published(video_url, media_id=None):
+    with _lock:
+        state = _load_state()
+        for entry in state.values():
+            if entry.get("url") == video_url:
+                entry.update(state="published", media_id=media_id, updated=time.time())
+        _save_state(state)
+
+# === Budget durchsetzen ===
+def _video_files():
+    for root, _, names in os.walk(OUTPUT_FOLDER):
+        for name in names:
+            path = os.path.join(root, name)
+            if name.endswith(".mp4") and not _protected(path):
+                yield path
+
+def collect_garbage(max_bytes=MAX_BYTES, max_age_hours=MAX_AGE_HOURS):
+    now = time.time()
+    with _lock:
+        state = _load_state()
+        files = []
+        for path in _video_files():
+            st = os.stat(path)
+            rank = STATES.index(state.get(_key(path), {}).get("state", "rendered"))
+            files.append((path, st.st_size, st.st_mtime, rank))
+
+        # Zu alte Dateien zuerst
+        files = [f for f in files if not (now - f[2] > max_age_hours * 3600 and _delete(f[0], state, "zu alt"))]
+
+        # Dann bis zum Byte-Budget: veröffentlichte vor hochgeladenen vor nur gerenderten, jeweils älteste zuerst
+        total = sum(f[1] for f in files)
+        for path, size, _, _ in sorted(files, key=lambda f: (-f[3], f[2])):
+            if total <= max_bytes:
+                break
+            if _delete(path, state, "Budget"):
+                total -= size
+
+        # Einträge gelöschter Dateien nach Ablauf der Aufbewahrungszeit vergessen
+        for key in [k for k, e in state.items() if e.get("deleted_at") and now - e["deleted_at"] > max_age_hours * 3600]:
+            del state[key]
+        _save_state(state)
+    return disk_usage()
+
+# === Kennzahlen ===
+def disk_usage():
+    with _lock:
+        state = _load_state()
+    by_state = {s: {"files": 0, "bytes": 0} for s in STATES}
+    total_files = total_bytes = 0
+    for root, _, names in os.walk(OUTPUT_FOLDER):
+        for name in names:
+            path = os.path.join(root, name)
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            total_files += 1
+            total_bytes += size
+            entry = state.get(_key(path))
+            if entry and entry.get("state") in by_state:
+                by_state[entry["state"]]["files"] += 1
+                by_state[entry["state"]]["bytes"] += size
+    disk = shutil.disk_usage(OUTPUT_FOLDER)
+    return {
+        "files": total_files,
+        "bytes": total_bytes,
+        "by_state": by_state,
+        "deleted_files": deleted["count"],
+        "deleted_bytes": deleted["bytes"],
+        "disk_free_bytes": disk.free,
+        "disk_total_bytes": disk.total,
+    }
@@ -0,0 +1,122 @@
+import os
+import time
+import random
+import datetime
+import threading
+import traceback
+from zoneinfo import ZoneInfo
+
+# Leer = Zeitzone des Servers (bisheriges Verhalten); auf Render ist das UTC
+POST_TIMEZONE = os.environ.get("POST_TIMEZONE")
+WINDOW_START_HOUR = int(os.environ.get("POST_WINDOW_START", 10))
+WINDOW_END_HOUR = int(os.environ.get("POST_WINDOW_END", 20))
+JITTER_MINUTES = (50, 70)
+# So viel früher anfangen, dass Rendern, Upload und Container-Verarbeitung vor dem Slot fertig sind
+LEAD_SECONDS = float(os.environ.get("SCHEDULE_LEAD_SECONDS", 180))
+# Lange Wartezeiten in Stücke teilen, damit Uhrkorrekturen (NTP) nicht aufaddiert werden
+MAX_WAIT_CHUNK = 3600
+
+# === Zeitfenster ===
+def timezone():
+    return ZoneInfo(POST_TIMEZONE) if POST_TIMEZONE else datetime.datetime.now().astimezone().tzinfo
+
+def now():
+    return datetime.datetime.now(timezone())
+
+def in_window(when=None):
+    when = when or now()
+    return WINDOW_START_HOUR <= when.hour < WINDOW_END_HOUR
+
+def next_window_start(when):
+    # Heute, falls noch vor Fensterbeginn, sonst morgen; ZoneInfo löst die Zeitumstellung selbst auf
+    start = when.replace(hour=WINDOW_START_HOUR, minute=0, second=0, microsecond=0)
+    if start < when:
+        start += datetime.timedelta(days=1)
+    return start
+
+def sleep_until(when, stop_event=None):
+    # Liefert False, wenn stop_event vorher gesetzt wurde
+    stop_event = stop_event or threading.Event()
+    while True:
+        remaining = when.timestamp() - time.time()
+        if remaining <= 0:
+            return True
+        if stop_event.wait(min(remaining, MAX_WAIT_CHUNK)):
+            return False
+
+def wait_for_slot(slot, stop_event=None):
+    # Vorbereitung läuft vor dem Slot, veröffentlicht wird erst zum Slot; ohne Slot sofort
+    if slot is None:
+        return True
+    return sleep_until(slot, stop_event)
+
+# === Planer ===
+class Scheduler:
+    def __init__(self, post, idle=None, lead_seconds=LEAD_SECONDS, jitter_minutes=JITTER_MINUTES):
+        # post(slot) wird lead_seconds vor dem Slot aufgerufen, idle(start) außerhalb des Zeitfensters
+        self.post = post
+        self.idle = idle
+        self.lead = datetime.timedelta(seconds=lead_seconds)
+        self.jitter_minutes = jitter_minutes
+        self._plan = []
+        # Slot, auf den run_forever gerade wartet oder den es postet
+        self._current = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _after(self, slot):
+        # Abstand in UTC rechnen, damit eine Zeitumstellung den Abstand nicht verfälscht
+        delta = datetime.timedelta(minutes=random.randint(*self.jitter_minutes))
+        candidate = (slot.astimezone(datetime.timezone.utc) + delta).astimezone(slot.tzinfo)
+        return candidate if in_window(candidate) else next_window_start(candidate)
+
+    def upcoming(self, n=5):
+        # Die Streuung wird im Voraus gezogen, die Vorschau ist also der echte Plan
+        with self._lock:
+            # Verpasste Slots (Start schon vorbei) fallen weg, sonst zeigt ein ruhender Planer ewig den alten Plan
+            current = now()
+            self._plan = [slot for slot in self._plan if slot - self.lead >= current or slot == self._current]
+            if not self._plan:
+                self._plan.append(current if in_window(current) else next_window_start(current))
+            while len(self._plan) < n:
+                self._plan.append(self._after(self._plan[-1]))
+            return list(self._plan[:n])
+
+    def hold_until(self, when):
+        return sleep_until(when, self._stop)
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            slot = self.upcoming(1)[0]
+            with self._lock:
+                self._current = slot
+            start = slot - self.lead
+            print(f"[INFO] Nächster Post um {slot:%Y-%m-%d %H:%M:%S %Z}, Start um {start:%H:%M:%S}")
+            if self.idle is not None and not in_window():
+                try:
+                    self.idle(start)
+                except Exception:
+                    print(f"[ERROR] Fehler außerhalb des Zeitfensters:\n{traceback.format_exc()}")
+            if not self.hold_until(start):
+                break
+            try:
+                self.post(slot)
+            except Exception:
+                print(f"[ERROR] Fehler beim Post für {slot:%H:%M:%S}:\n{traceback.format_exc()}")
+            with self._lock:
+                if slot in self._plan:
+                    self._plan.remove(slot)
+                self._current = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run_forever, name="scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
@@ -0,0 +1,65 @@
+import os
+import hashlib
+import threading
+import subprocess
+import imageio_ffmpeg
+from raw_compositor import open_writer, render_raw
+
+_lock = threading.Lock()
+
+# === Vorkodierter Rest der Vorlage ===
+def _tail_path(template_path, frames, start, fps, codec, encode):
+    # Alles, was die Bytes des Segments bestimmt; ändert sich etwas, entsteht ein neues Segment
+    st = os.stat(template_path)
+    key = (os.path.abspath(template_path), st.st_mtime_ns, st.st_size, frames.shape, start, fps, codec, sorted(encode.items()))
+    digest = hashlib.sha1(repr(key).encode()).hexdigest()[:12]
+    folder = os.path.join(os.path.dirname(os.path.abspath(template_path)), "segments")
+    return os.path.join(folder, f"tail_{start}_{digest}.mp4")
+
+def tail_segment(template_path, frames, start, fps=24, codec="libx264", **encode):
+    path = _tail_path(template_path, frames, start, fps, codec, encode)
+    with _lock:
+        if os.path.isfile(path):
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Endung .mp4 behalten, ffmpeg wählt den Muxer danach
+        tmp_path = f"{path[:-4]}.{os.getpid()}.tmp.mp4"
+        print(f"[INFO] Kodiere Vorlage ab Frame {start} vor → {path}")
+        height, width = frames.shape[1:3]
+        writer = open_writer(tmp_path, width, height, fps=fps, codec=codec, **encode)
+        try:
+            for i in range(start, len(frames)):
+                writer.send(frames[i])
+        finally:
+            writer.close()
+        os.replace(tmp_path, path)
+    return path
+
+# === Zusammenfügen ohne Neukodierung ===
+def concat_copy(parts, filename):
+    list_path = f"{os.path.splitext(filename)[0]}.concat.txt"
+    with open(list_path, "w", encoding="utf-8") as f:
+        for part in parts:
+            escaped = os.path.abspath(part).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    try:
+        subprocess.run([imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-loglevel", "error",
+                        "-f", "concat", "-safe", "0", "-i", list_path, "-c", "copy", filename], check=True)
+    finally:
+        os.remove(list_path)
+    return filename
+
+def render_concat(template_path, frames, text_np, filename, overlay_frames, fps=24, codec="libx264", **encode):
+    # Steht der Text über die ganze Länge, gibt es nichts zu kopieren
+    if overlay_frames is None or overlay_frames >= len(frames):
+        return render_raw(frames, text_np, filename, fps=fps, codec=codec, **encode)
+
+    tail = tail_segment(template_path, frames, overlay_frames, fps=fps, codec=codec, **encode)
+    head = f"{os.path.splitext(filename)[0]}.head.mp4"
+    try:
+        render_raw(frames[:overlay_frames], text_np, head, fps=fps, codec=codec, **encode)
+        concat_copy([head, tail], filename)
+    finally:
+        if os.path.exists(head):
+            os.remove(head)
+    return filename
@@ -0,0 +1,132 @@
+import os
+import subprocess
+import threading
+import numpy as np
+import imageio_ffmpeg
+from raw_compositor import Overlay, encoder_command
+
+# Obergrenze für Python-Prozess plus beide ffmpeg-Kindprozesse; 0 = aus.
+# Die freie Render-Instanz hat 512 MB, darüber beendet der OOM-Killer den ganzen Dienst
+MAX_RSS_MB = int(os.environ.get("RENDER_MAX_RSS_MB", 450))
+
+_sizes = {}
+_lock = threading.Lock()
+
+class MemoryLimitExceeded(Exception):
+    pass
+
+# === Speicher messen ===
+def rss_bytes(pid="self"):
+    # Aktueller Resident Set aus /proc; None, wo es kein /proc gibt (Windows, macOS)
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return 0
+
+class RssGuard:
+    def __init__(self, limit_mb=MAX_RSS_MB):
+        self.limit = limit_mb * 1024 * 1024
+        self.pids = []
+        self.peak = rss_bytes() or 0
+        self.enabled = bool(limit_mb) and rss_bytes() is not None
+        if limit_mb and not self.enabled:
+            print("[WARN] Kein /proc – RSS-Obergrenze wird nicht geprüft.")
+
+    def watch(self, proc):
+        self.pids.append(proc.pid)
+        return proc
+
+    def check(self):
+        if not self.enabled:
+            return
+        total = sum(rss_bytes(pid) or 0 for pid in ("self", *self.pids))
+        self.peak = max(self.peak, total)
+        if total > self.limit:
+            raise MemoryLimitExceeded(f"RSS {total // (1024 * 1024)} MB über Obergrenze {self.limit // (1024 * 1024)} MB")
+
+# === Vorlage Frame für Frame ===
+def output_size(template_path, height):
+    # Gleiche Breite wie resize(height=...) in moviepy: abgeschnitten, nicht gerundet
+    key = (os.path.abspath(template_path), os.stat(template_path).st_mtime_ns)
+    with _lock:
+        if key not in _sizes:
+            reader = imageio_ffmpeg.read_frames(template_path)
+            try:
+                _sizes[key] = next(reader)["source_size"]
+            finally:
+                reader.close()
+        src_w, src_h = _sizes[key]
+    return int(src_w * height / src_h), height
+
+def open_decoder(template_path, width, height, duration, fps):
+    cmd = [
+        imageio_ffmpeg.get_ffmpeg_exe(), "-loglevel", "error", "-t", str(duration), "-i", template_path,
+        "-vf", f"fps={fps},scale={width}:{height}:flags=lanczos",
+        "-frames:v", str(int(round(duration * fps))),
+        "-f", "rawvideo", "-pix_fmt", "rgb24", "pipe:1",
+    ]
+    return subprocess.Popen(cmd, stdout=subprocess.PIPE)
+
+def _read_into(stream, view):
+    filled = 0
+    while filled < len(view):
+        n = stream.readinto(view[filled:])
+        if not n:
+            break
+        filled += n
+    return filled
+
+def _stop(proc):
+    if proc.poll() is None:
+        proc.kill()
+    proc.wait()
+
+# === Rendern ===
+def render_stream(template_path, text_np, filename, height=1080, duration=3, fps=24, codec="libx264", overlay_frames=None,
+                  max_rss_mb=MAX_RSS_MB, preset="ultrafast", threads=2, crf=None, gop=None, tune=None):
+    # Liefert (filename, Spitzen-RSS in Bytes); bei Überschreitung bleibt keine halbe Datei liegen
+    width, height = output_size(template_path, height)
+    guard = RssGuard(max_rss_mb)
+    overlay = Overlay(text_np, width, height)
+    # Ein einziger Frame-Puffer: ffmpeg liest hinein, das Overlay wird an Ort und Stelle eingeblendet
+    buf = np.empty((height, width, 3), dtype=np.uint8)
+    view = memoryview(buf).cast("B")
+
+    decoder = guard.watch(open_decoder(template_path, width, height, duration, fps))
+    encoder = None
+    ok = False
+    try:
+        cmd = encoder_command(width, height, fps, codec, preset, threads, crf, gop, tune) + [filename]
+        encoder = guard.watch(subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL))
+        i = 0
+        while _read_into(decoder.stdout, view) == len(view):
+            if overlay_frames is None or i < overlay_frames:
+                overlay.blend_into(buf)
+            encoder.stdin.write(view)
+            i += 1
+            guard.check()
+        if i == 0 or decoder.wait() != 0:
+            raise RuntimeError(f"Vorlage {template_path} konnte nicht dekodiert werden")
+        encoder.stdin.close()
+        if encoder.wait() != 0:
+            raise RuntimeError(f"ffmpeg-Encoder für {filename} fehlgeschlagen")
+        ok = True
+    finally:
+        decoder.stdout.close()
+        _stop(decoder)
+        if encoder is not None:
+            # Bei Abbruch erst beenden, sonst wartet close() auf einen vollen Pipe-Puffer
+            if not ok:
+                _stop(encoder)
+            try:
+                encoder.stdin.close()
+            except OSError:
+                pass
+            encoder.wait()
+        if not ok and os.path.exists(filename):
+            os.remove(filename)
+    return filename, guard.peak
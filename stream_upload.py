@@ -0,0 +1,118 @@
+import os
+import queue
+import threading
+import cloudinary
+import cloudinary.utils
+import cloudinary.uploader
+from math_video import TEMPLATE_PATH, RENDER_SETTINGS, generate_equation_variant, create_text_image, overlay_frame_count
+from template_cache import get_template_frames
+from raw_compositor import open_stream_encoder, iter_composited
+import metrics
+
+# "stream" lädt direkt aus dem Encoder hoch, "file" schreibt erst die MP4 und lädt sie dann hoch
+UPLOAD_MODE = os.environ.get("UPLOAD_MODE", "file")
+# Cloudinary verlangt mindestens 5 MB pro Chunk (außer dem letzten)
+CHUNK_SIZE = int(os.environ.get("STREAM_CHUNK_SIZE", 6 * 1024 * 1024))
+
+# === Chunks aus dem Stream lesen ===
+def _read_chunks(stream, chunk_size, out_q, copy_to=None):
+    try:
+        copy = open(copy_to, "wb") if copy_to else None
+        try:
+            buf = bytearray()
+            while True:
+                data = stream.read(65536)
+                if not data:
+                    break
+                if copy:
+                    copy.write(data)
+                buf += data
+                while len(buf) >= chunk_size:
+                    out_q.put(bytes(buf[:chunk_size]))
+                    del buf[:chunk_size]
+            if buf:
+                out_q.put(bytes(buf))
+        finally:
+            if copy:
+                copy.close()
+        out_q.put(None)
+    except Exception as e:
+        out_q.put(e)
+
+# === Chunked Upload mit unbekannter Gesamtgröße ===
+def stream_upload(stream, chunk_size=CHUNK_SIZE, filename="stream.mp4", copy_to=None, **options):
+    options.setdefault("resource_type", "video")
+    chunks = queue.Queue()
+    reader = threading.Thread(target=_read_chunks, args=(stream, chunk_size, chunks, copy_to), daemon=True)
+    reader.start()
+
+    upload_id = cloudinary.utils.random_public_id()
+    current = 0
+    result = None
+    pending = chunks.get()
+    while pending is not None:
+        if isinstance(pending, Exception):
+            raise pending
+        following = chunks.get()
+        end = current + len(pending) - 1
+        # Gesamtgröße ist erst beim letzten Chunk bekannt, davor "-1"
+        total = end + 1 if following is None else -1
+        headers = {"Content-Range": f"bytes {current}-{end}/{total}", "X-Unique-Upload-Id": upload_id}
+        result = cloudinary.uploader.upload_large_part((filename, pending), http_headers=headers, **options)
+        options["public_id"] = result.get("public_id")
+        current = end + 1
+        pending = following
+
+    reader.join()
+    if result is None:
+        raise RuntimeError("Encoder hat keine Daten geliefert.")
+    return result
+
+# === Rendern und gleichzeitig hochladen ===
+def render_and_upload(frames, text_np, fps=24, preset="ultrafast", threads=2, crf=None, gop=None, tune=None,
+                      overlay_frames=None, chunk_size=CHUNK_SIZE, copy_to=None, **options):
+    height, width = frames.shape[1:3]
+    proc = open_stream_encoder(width, height, fps=fps, preset=preset, threads=threads, crf=crf, gop=gop, tune=tune)
+    outcome = {}
+
+    def upload():
+        try:
+            outcome["result"] = stream_upload(proc.stdout, chunk_size=chunk_size, copy_to=copy_to, **options)
+        except Exception as e:
+            outcome["error"] = e
+            # ffmpeg nicht auf einer vollen stdout-Pipe hängen lassen
+            proc.kill()
+
+    uploader = threading.Thread(target=upload, daemon=True)
+    uploader.start()
+    try:
+        for frame in iter_composited(frames, text_np, overlay_frames):
+            proc.stdin.write(frame.tobytes())
+    except BrokenPipeError:
+        pass
+    finally:
+        proc.stdin.close()
+        uploader.join()
+        returncode = proc.wait()
+
+    if "error" in outcome:
+        raise outcome["error"]
+    if returncode != 0:
+        raise RuntimeError(f"ffmpeg beendet mit Code {returncode}")
+    return outcome["result"]
+
+def create_and_upload_math_video(equation=None, copy_to=None, **options):
+    equation = equation or generate_equation_variant()
+    print(f"[INFO] Generierte Gleichung: {equation}")
+    cfg = RENDER_SETTINGS
+    with metrics.span("template_load"):
+        frames = get_template_frames(TEMPLATE_PATH, height=cfg["height"], duration=cfg["duration"], fps=cfg["fps"])
+    text_np = create_text_image(equation, frames.shape[2], cfg["text_height"])
+    print("[INFO] Rendere und streame → Cloudinary...")
+    with metrics.span("encode_upload"):
+        res = render_and_upload(frames, text_np, fps=cfg["fps"], preset=cfg["preset"], threads=cfg["threads"],
+                                crf=cfg["crf"], gop=cfg["gop"], tune=cfg["tune"], overlay_frames=overlay_frame_count(len(frames)),
+                                copy_to=copy_to, **options)
+    metrics.annotate(equation=equation)
+    print(f"[INFO] Cloudinary URL: {res['secure_url']}")
+    return res["secure_url"]
@@ -0,0 +1,117 @@
+import os
+import glob
+import hashlib
+import threading
+import numpy as np
+
+# Modus: "mmap" legt die dekodierten Frames als .npy neben die Vorlage, "memory" hält sie nur im RAM
+CACHE_MODE = os.environ.get("TEMPLATE_CACHE", "mmap")
+
+_cache = {}
+_lock = threading.Lock()
+
+# === Cache-Schlüssel ===
+def _cache_key(template_path, height, duration, fps):
+    st = os.stat(template_path)
+    return (os.path.abspath(template_path), st.st_mtime_ns, height, duration, fps)
+
+def _npy_prefix(template_path, height):
+    return f"{os.path.splitext(os.path.abspath(template_path))[0]}.{height}p_"
+
+def _npy_path(key):
+    path, _, height, _, _ = key
+    digest = hashlib.sha1(repr(key).encode()).hexdigest()[:12]
+    return f"{_npy_prefix(path, height)}{digest}.npy"
+
+# === Vorlage dekodieren und skalieren ===
+def _open_template(template_path, height, duration):
+    from PIL import Image
+    if not hasattr(Image, "ANTIALIAS"):
+        Image.ANTIALIAS = Image.Resampling.LANCZOS
+    from moviepy.editor import VideoFileClip
+    clip = VideoFileClip(template_path)
+    return clip, clip.subclip(0, duration).resize(height=height)
+
+def _frame_times(duration, fps):
+    # Gleiche Zeitpunkte wie moviepy's iter_frames beim write_videofile
+    return np.arange(0, duration, 1.0 / fps)
+
+def _decode_to_memory(template_path, height, duration, fps):
+    clip, resized = _open_template(template_path, height, duration)
+    try:
+        times = _frame_times(resized.duration, fps)
+        frames = np.empty((len(times), resized.h, resized.w, 3), dtype=np.uint8)
+        for i, t in enumerate(times):
+            frames[i] = resized.get_frame(t)
+        return frames
+    finally:
+        clip.close()
+
+def _decode_to_npy(template_path, height, duration, fps, npy_path):
+    clip, resized = _open_template(template_path, height, duration)
+    tmp_path = f"{npy_path}.{os.getpid()}.tmp"
+    try:
+        times = _frame_times(resized.duration, fps)
+        out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.uint8,
+                                        shape=(len(times), resized.h, resized.w, 3))
+        for i, t in enumerate(times):
+            out[i] = resized.get_frame(t)
+        out.flush()
+        del out
+        os.replace(tmp_path, npy_path)
+    finally:
+        clip.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _remove_stale_npy(template_path, height, keep):
+    for path in glob.glob(f"{glob.escape(_npy_prefix(template_path, height))}*.npy"):
+        if path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+# === Öffentliche API ===
+def get_template_frames(template_path, height=1080, duration=3, fps=24):
+    key = _cache_key(template_path, height, duration, fps)
+    with _lock:
+        frames = _cache.get(key)
+        if frames is not None:
+            return frames
+
+        # Alte Einträge derselben Vorlage (andere mtime) verwerfen
+        for old_key in [k for k in _cache if k[0] == key[0] and k[2:] == key[2:]]:
+            del _cache[old_key]
+
+        frames = None
+        if CACHE_MODE == "mmap":
+            npy_path = _npy_path(key)
+            try:
+                if not os.path.isfile(npy_path):
+                    print(f"[INFO] Dekodiere Vorlage {template_path} → {npy_path}")
+                    _decode_to_npy(template_path, height, duration, fps, npy_path)
+                    _remove_stale_npy(template_path, height, npy_path)
+                frames = np.load(npy_path, mmap_mode="r")
+            except OSError as e:
+                print(f"[WARN] Vorlagen-Cache auf Disk nicht möglich ({e}) – nutze RAM.")
+        if frames is None:
+            print(f"[INFO] Dekodiere Vorlage {template_path} in den Speicher")
+            frames = _decode_to_memory(template_path, height, duration, fps)
+
+        _cache[key] = frames
+        return frames
+
+def template_clip(template_path, height=1080, duration=3, fps=24):
+    from moviepy.editor import VideoClip
+    frames = get_template_frames(template_path, height, duration, fps)
+    last = len(frames) - 1
+
+    def make_frame(t):
+        return frames[min(int(round(t * fps)), last)]
+
+    return VideoClip(make_frame, duration=duration)
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,43 @@
+import types
+import pytest
+import equation_index
+from equation_index import EquationIndex, FAMILIES
+
+@pytest.fixture
+def clock(monkeypatch):
+    when = [1_000_000.0]
+    monkeypatch.setattr(equation_index, "time", types.SimpleNamespace(time=lambda: when[0]))
+    return when
+
+def test_draw_never_repeats_within_history(clock):
+    index = EquationIndex(seed=1)
+    drawn = []
+    for _ in range(len(index)):
+        drawn.append(index.draw())
+        clock[0] += 1
+    assert len(set(drawn)) == len(index)
+    # Alles in der Historie: die am längsten nicht gezogene kommt wieder
+    assert index.draw() == drawn[0]
+
+def test_remembered_equations_are_skipped(clock):
+    index = EquationIndex(seed=2)
+    free = "(x + 9)(x - 7) = 0"
+    index.remember([eq for eq in index.equations if eq != free] + ["unbekannt = 0"])
+    assert index.draw() == free
+
+def test_families_come_back_after_history(clock):
+    index = EquationIndex(seed=3, history_days=1)
+    index.remember(index.equations)
+    clock[0] += 2 * 86400
+    drawn = [index.lookup(index.draw())["family"] for _ in range(100)]
+    assert set(drawn) == set(FAMILIES)
+
+def test_batch_respects_history_and_difficulty(clock):
+    index = EquationIndex(seed=4)
+    earlier = set(index.batch(50))
+    easy = index.batch(len(index), difficulty=(1, 2))
+    assert len(set(easy)) == len(easy) and not earlier & set(easy)
+    assert all(1 <= index.lookup(eq)["difficulty"] <= 2 for eq in easy)
+    # Alle leichten Gleichungen vergeben: nächster Batch bleibt leer, draw() weicht auf andere aus
+    assert index.batch(5, difficulty=(1, 2)) == []
+    assert index.draw() not in earlier | set(easy)
@@ -0,0 +1,62 @@
+import time
+import threading
+import pytest
+from jobs import JobQueue, QueueFull
+
+@pytest.fixture
+def gate():
+    # Hält den Worker im ersten Job fest, bis der Test ihn freigibt
+    event = threading.Event()
+    yield event
+    event.set()
+
+def _wait_status(jobs, job_id, status, timeout=5):
+    deadline = time.monotonic() + timeout
+    while jobs.get(job_id)["status"] != status:
+        if time.monotonic() > deadline:
+            raise AssertionError(f"Job {job_id} nicht {status}: {jobs.get(job_id)}")
+        time.sleep(0.01)
+
+def test_trigger_while_queued_is_coalesced(gate):
+    jobs = JobQueue(lambda: gate.wait(), workers=1, max_pending=2, coalesce_seconds=0)
+    running, _ = jobs.submit(key="block")
+    _wait_status(jobs, running["id"], "running")
+
+    first, created = jobs.submit()
+    again, created_again = jobs.submit()
+    assert created and not created_again
+    assert again["id"] == first["id"]
+    assert jobs.get(first["id"])["coalesced"] == 1
+
+def test_trigger_while_running_coalesces_only_inside_window(gate):
+    jobs = JobQueue(lambda: gate.wait(), workers=1, max_pending=2, coalesce_seconds=60)
+    job, _ = jobs.submit()
+    _wait_status(jobs, job["id"], "running")
+    assert jobs.submit()[0]["id"] == job["id"]
+
+    jobs.coalesce_seconds = 0
+    other, created = jobs.submit()
+    assert created and other["id"] != job["id"]
+
+def test_other_keys_are_not_coalesced(gate):
+    jobs = JobQueue(lambda: gate.wait(), workers=1, max_pending=3, coalesce_seconds=60)
+    a, _ = jobs.submit(key="post")
+    b, created = jobs.submit(key="scheduled")
+    assert created and a["id"] != b["id"]
+
+def test_queue_full_raises(gate):
+    jobs = JobQueue(lambda: gate.wait(), workers=1, max_pending=1, coalesce_seconds=0)
+    running, _ = jobs.submit(key="a")
+    _wait_status(jobs, running["id"], "running")
+    jobs.submit(key="b")
+    with pytest.raises(QueueFull):
+        jobs.submit(key="c")
+
+def test_failed_target_marks_job_failed():
+    def boom():
+        raise RuntimeError("kaputt")
+
+    jobs = JobQueue(boom, workers=1, max_pending=1, coalesce_seconds=0)
+    job, _ = jobs.submit()
+    _wait_status(jobs, job["id"], "failed")
+    assert "kaputt" in jobs.get(job["id"])["error"]
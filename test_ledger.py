@@ -0,0 +1,137 @@
+import pytest
+from fake_services import FakeGraphAPI
+from graph_client import GraphClient
+from ledger import Ledger, LedgerError, LedgerDeferred
+from accounts import AccountRegistry
+
+CAPTION = "Can you solve this? #math #reel #puzzle"
+
+# Veröffentlicht, aber nicht protokolliert: Antwort auf /media_publish ging verloren oder der Prozess starb davor
+
+@pytest.fixture
+def graph():
+    server = FakeGraphAPI(processing_delay=0).start()
+    yield server
+    server.stop()
+
+def _unexpected(*args):
+    raise AssertionError("darf beim Fortsetzen nicht aufgerufen werden")
+
+def _published_but_not_recorded(ledger, client, stage):
+    job = ledger.start("3x + 2 = 11")
+    ledger.advance(job, "uploaded", video_url="https://example.invalid/video.mp4")
+    creation_id = client.create_container(job["video_url"], CAPTION)
+    ledger.advance(job, stage, creation_id=creation_id)
+    client.publish(creation_id)
+    return ledger.get(job["id"])
+
+@pytest.mark.parametrize("stage", ["container", "publishing"])
+def test_resume_treats_published_container_as_done(tmp_path, graph, stage):
+    ledger = Ledger(path=str(tmp_path / "ledger.sqlite3"))
+    client = GraphClient("user0", "token0", base_url=graph.base_url)
+    job = _published_but_not_recorded(ledger, client, stage)
+
+    job = ledger.run(job, produce=_unexpected, upload=_unexpected, create_container=_unexpected,
+                     wait_status=lambda creation_id: client.wait_for_status(creation_id, 5), publish=_unexpected)
+
+    assert job["stage"] == "published"
+    assert ledger.get(job["id"])["stage"] == "published"
+    assert len(graph.containers) == 1
+    assert len(graph.published) == 1
+
+def test_publishing_stage_never_recreates_container(tmp_path, graph):
+    ledger = Ledger(path=str(tmp_path / "ledger.sqlite3"))
+    client = GraphClient("user0", "token0", base_url=graph.base_url)
+    job = ledger.start("3x + 2 = 11")
+    ledger.advance(job, "uploaded", video_url="https://example.invalid/video.mp4")
+    ledger.advance(job, "publishing", creation_id=client.create_container(job["video_url"], CAPTION))
+
+    with pytest.raises(LedgerError):
+        ledger.run(job, produce=_unexpected, upload=_unexpected, create_container=_unexpected,
+                   wait_status=lambda creation_id: "EXPIRED", publish=_unexpected)
+
+    stored = ledger.get(job["id"])
+    assert stored["stage"] == "publishing"
+    assert stored["creation_id"] == job["creation_id"]
+    assert len(graph.containers) == 1
+
+def test_fan_out_resume_treats_published_container_as_done(tmp_path, graph):
+    ledger = Ledger(path=str(tmp_path / "ledger.sqlite3"))
+    accounts = AccountRegistry([{"name": "a", "user_id": "user0", "access_token": "token0", "caption": CAPTION, "max_posts_per_day": 25},
+                                {"name": "b", "user_id": "user1", "access_token": "token1", "caption": CAPTION, "max_posts_per_day": 25}],
+                               ledger, max_wait=5)
+    for client in accounts.clients.values():
+        client.base_url = graph.base_url
+    job = ledger.start("3x + 2 = 11")
+    ledger.advance(job, "uploaded", video_url="https://example.invalid/video.mp4")
+    creation_id = accounts.clients["a"].create_container(job["video_url"], CAPTION)
+    ledger.advance_target(job["id"], "a", "publishing", creation_id=creation_id)
+    accounts.clients["a"].publish(creation_id)
+
+    job = ledger.run(ledger.get(job["id"]), produce=_unexpected, upload=_unexpected, fan_out=accounts.fan_out)
+
+    assert job["stage"] == "published"
+    assert {t["stage"] for t in ledger.targets(job["id"]).values()} == {"published"}
+    assert sorted(p["user"] for p in graph.published) == ["user0", "user1"]
+
+def test_fan_out_without_budget_keeps_job_uploaded(tmp_path, graph):
+    ledger = Ledger(path=str(tmp_path / "ledger.sqlite3"))
+    accounts = AccountRegistry([{"name": "a", "user_id": "user0", "access_token": "token0", "caption": CAPTION, "max_posts_per_day": 0},
+                                {"name": "b", "user_id": "user1", "access_token": "token1", "caption": CAPTION, "max_posts_per_day": 0}],
+                               ledger, max_wait=5)
+    for client in accounts.clients.values():
+        client.base_url = graph.base_url
+    job = ledger.start("3x + 2 = 11")
+    ledger.advance(job, "uploaded", video_url="https://example.invalid/video.mp4")
+
+    with pytest.raises(LedgerDeferred):
+        ledger.run(job, produce=_unexpected, upload=_unexpected, fan_out=accounts.fan_out)
+    stored = ledger.get(job["id"])
+    assert (stored["stage"], stored["attempts"]) == ("uploaded", 0)
+    assert {t["stage"] for t in ledger.targets(job["id"]).values()} == {"skipped"}
+
+    # Budget wieder frei: übersprungene Konten werden beim nächsten Versuch gepostet
+    for account in accounts.accounts:
+        account["max_posts_per_day"] = 25
+    job = ledger.run(stored, produce=_unexpected, upload=_unexpected, fan_out=accounts.fan_out)
+    assert job["stage"] == "published"
+    assert len(graph.published) == 2
+
+def test_single_account_is_recorded_and_budgeted(tmp_path, graph, monkeypatch):
+    import posting
+    monkeypatch.setattr(posting.retention, "mark_published", lambda *args: None)
+    ledger = Ledger(path=str(tmp_path / "ledger.sqlite3"))
+    account = {"name": "a", "user_id": "user0", "access_token": "token0", "caption": CAPTION, "max_posts_per_day": 1}
+    accounts = AccountRegistry([account], ledger, max_wait=5)
+    accounts.clients["a"].base_url = graph.base_url
+    poster = posting.PostRunner(ledger, accounts.clients["a"], _unexpected, _unexpected, _unexpected, accounts=accounts)
+
+    def uploaded_job():
+        job = ledger.start("3x + 2 = 11")
+        return ledger.advance(job, "uploaded", video_url="https://example.invalid/video.mp4")
+
+    assert poster.run(uploaded_job())["stage"] == "published"
+    assert accounts.status()[0]["budget_left"] == 0
+
+    # Zweiter Post am selben Tag: Budget von 1 verbraucht, der Job wartet
+    with pytest.raises(LedgerDeferred):
+        poster.run(uploaded_job())
+    assert len(graph.published) == 1
+
+def test_prerendered_video_does_not_draw_an_equation(tmp_path, monkeypatch):
+    import posting
+    drawn = []
+    def generate():
+        drawn.append("2x + 1 = 7")
+        return drawn[-1]
+
+    ledger = Ledger(path=str(tmp_path / "ledger.sqlite3"))
+    poster = posting.PostRunner(ledger, None, lambda equation: {"video_path": f"{equation}.mp4"}, _unexpected, generate)
+    monkeypatch.setattr(posting, "take_next_item", lambda: {"file": "queue/a.mp4", "equation": "3x + 2 = 11"})
+    assert poster.produce(None) == {"video_path": "queue/a.mp4", "equation": "3x + 2 = 11"}
+    assert drawn == []
+
+    # Warteschlange leer: erst jetzt wird gezogen
+    monkeypatch.setattr(posting, "take_next_item", lambda: None)
+    assert poster.produce(None) == {"equation": "2x + 1 = 7", "video_path": "2x + 1 = 7.mp4"}
+    assert drawn == ["2x + 1 = 7"]
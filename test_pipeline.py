@@ -0,0 +1,58 @@
+import pytest
+import posting
+from fake_services import FakeGraphAPI
+from ledger import Ledger
+from accounts import AccountRegistry
+from pipeline import Pipeline
+
+CAPTION = "Can you solve this? #math #reel #puzzle"
+
+@pytest.fixture
+def graph():
+    server = FakeGraphAPI(processing_delay=0).start()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def poster(tmp_path, graph, monkeypatch):
+    monkeypatch.setattr(posting, "take_next_item", lambda: None)
+    monkeypatch.setattr(posting.retention, "mark_published", lambda *args: None)
+    ledger = Ledger(path=str(tmp_path / "ledger.sqlite3"))
+    accounts = AccountRegistry([{"name": "a", "user_id": "user0", "access_token": "token0", "caption": CAPTION, "max_posts_per_day": 2}],
+                               ledger, max_wait=5)
+    accounts.clients["a"].base_url = graph.base_url
+
+    def render(equation):
+        path = tmp_path / f"{len(list(tmp_path.glob('*.mp4')))}.mp4"
+        path.write_bytes(b"video")
+        return {"video_path": str(path)}
+
+    return posting.PostRunner(ledger, accounts.clients["a"], render, lambda path: f"https://example.invalid/{path}",
+                              lambda: "3x + 2 = 11", accounts=accounts)
+
+def test_stage_runs_keep_the_job_claimed(poster):
+    job = poster.run(poster.ledger.start(), until="rendered")
+    assert job["stage"] == "rendered"
+    assert poster.ledger.claim_next() is None
+
+    job = poster.run(job, until="uploaded")
+    assert job["stage"] == "uploaded"
+    assert poster.ledger.claim_next() is None
+
+    assert poster.run(job)["stage"] == "published"
+    assert not poster.ledger._claimed
+
+def test_pipeline_posts_through_ledger_and_budget(poster, graph):
+    pipeline = Pipeline(
+        render=lambda equation: poster.run(poster.ledger.start(equation), until="rendered"),
+        upload=lambda job: poster.run(job, until="uploaded"),
+        publish=poster.run,
+    )
+    for _ in range(3):
+        pipeline.submit()
+    results = pipeline.close()
+
+    # Tagesbudget 2: der dritte Job bleibt hochgeladen und wartet
+    assert sorted(r["job"]["stage"] for r in results) == ["published", "published", "uploaded"]
+    assert len(graph.published) == 2
+    assert poster.ledger.counts() == {"published": 2, "uploaded": 1}
@@ -0,0 +1,72 @@
+import datetime
+from zoneinfo import ZoneInfo
+import pytest
+import scheduler
+
+BERLIN = ZoneInfo("Europe/Berlin")
+
+@pytest.fixture(autouse=True)
+def window(monkeypatch):
+    monkeypatch.setattr(scheduler, "WINDOW_START_HOUR", 10)
+    monkeypatch.setattr(scheduler, "WINDOW_END_HOUR", 20)
+
+def _clock(monkeypatch, when):
+    monkeypatch.setattr(scheduler, "now", lambda: when[0])
+
+def test_in_window_bounds():
+    day = datetime.datetime(2026, 10, 18, tzinfo=BERLIN)
+    assert not scheduler.in_window(day.replace(hour=9, minute=59))
+    assert scheduler.in_window(day.replace(hour=10))
+    assert scheduler.in_window(day.replace(hour=19, minute=59))
+    assert not scheduler.in_window(day.replace(hour=20))
+
+def test_next_window_start_across_dst():
+    # Nacht der Umstellung auf Sommerzeit: Fensterbeginn am nächsten Tag um 10 Uhr Ortszeit, jetzt UTC+2
+    start = scheduler.next_window_start(datetime.datetime(2026, 3, 28, 21, 0, tzinfo=BERLIN))
+    assert (start.day, start.hour, start.utcoffset()) == (29, 10, datetime.timedelta(hours=2))
+    # Vor Fensterbeginn: noch am selben Tag
+    assert scheduler.next_window_start(datetime.datetime(2026, 10, 25, 7, 0, tzinfo=BERLIN)).day == 25
+
+def test_after_counts_jitter_in_real_time_and_respects_window():
+    planner = scheduler.Scheduler(None, jitter_minutes=(60, 60))
+    slot = datetime.datetime(2026, 10, 18, 12, 0, tzinfo=BERLIN)
+    assert planner._after(slot) == slot + datetime.timedelta(hours=1)
+    # Nach Fensterende geht es am nächsten Morgen weiter
+    late = planner._after(slot.replace(hour=19, minute=30))
+    assert (late.day, late.hour, late.minute) == (19, 10, 0)
+
+def test_upcoming_drops_stale_slots(monkeypatch):
+    clock = [datetime.datetime(2026, 10, 18, 11, 0, tzinfo=BERLIN)]
+    _clock(monkeypatch, clock)
+    planner = scheduler.Scheduler(None, lead_seconds=180)
+    first = planner.upcoming(2)
+    assert first[0] == clock[0]
+
+    clock[0] += datetime.timedelta(days=2)
+    later = planner.upcoming(2)
+    assert later[0] == clock[0]
+    assert all(slot >= clock[0] for slot in later)
+    assert not set(first) & set(later)
+
+def test_upcoming_keeps_future_slots_stable(monkeypatch):
+    clock = [datetime.datetime(2026, 10, 18, 11, 0, tzinfo=BERLIN)]
+    _clock(monkeypatch, clock)
+    planner = scheduler.Scheduler(None, lead_seconds=180)
+    plan = planner.upcoming(4)
+    # Erster Slot ist vorbei, die übrigen bleiben unverändert
+    clock[0] = plan[1] - datetime.timedelta(minutes=10)
+    assert planner.upcoming(3) == plan[1:4]
+
+def test_run_forever_posts_due_slot_and_stops(monkeypatch):
+    posted = []
+    planner = scheduler.Scheduler(None, lead_seconds=0, jitter_minutes=(60, 60))
+    monkeypatch.setattr(scheduler, "in_window", lambda when=None: True)
+
+    def post(slot):
+        posted.append(slot)
+        planner.stop()
+
+    planner.post = post
+    planner.run_forever()
+    assert len(posted) == 1
+    assert planner.upcoming(1)[0] != posted[0]
@@ -0,0 +1,141 @@
+import os
+import functools
+import threading
+import numpy as np
+from PIL import Image, ImageFont
+
+FONT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Die mitgelieferten Dateien heißen klein geschrieben – "Arial.ttf" gibt es unter Linux nicht
+FONT_FILES = {False: "arial.ttf", True: "arialbd.ttf"}
+FALLBACK_FONT = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+# Zeichen, aus denen die Gleichungen bestehen; werden beim ersten Zugriff vorgerastert
+ALPHABET = "0123456789x²+-−()/= "
+
+# === Fonts einmal laden ===
+@functools.lru_cache(maxsize=None)
+def load_font(size, bold=False):
+    for path in (os.path.join(FONT_DIR, FONT_FILES[bold]), FALLBACK_FONT):
+        if os.path.exists(path):
+            return ImageFont.truetype(path, size)
+    print("[WARN] Kein TrueType-Font gefunden – nutze Pillow-Standardfont.")
+    return ImageFont.load_default()
+
+# === Glyphen-Cache ===
+class GlyphCache:
+    def __init__(self, font):
+        self.font = font
+        self._glyphs = {}
+        self._lengths = {}
+        self._bboxes = {}
+        self._lock = threading.Lock()
+        for ch in ALPHABET:
+            self.glyph(ch)
+
+    def glyph(self, ch):
+        g = self._glyphs.get(ch)
+        if g is None:
+            core, (ox, oy) = self.font.getmask2(ch, mode="L")
+            w, h = core.size
+            mask = np.array(Image.frombytes("L", (w, h), bytes(core))) if w and h else np.zeros((0, 0), np.uint8)
+            g = (mask, ox, oy)
+            with self._lock:
+                self._glyphs[ch] = g
+        return g
+
+    def _length(self, text):
+        n = self._lengths.get(text)
+        if n is None:
+            n = self.font.getlength(text)
+            with self._lock:
+                self._lengths[text] = n
+        return n
+
+    def layout(self, text):
+        # Stiftposition = Summe der Vorschübe plus Unterschneidung je Zeichenpaar, wie Pillows Basis-Layout
+        placed = []
+        pen = 0.0
+        for i, ch in enumerate(text):
+            if i:
+                prev = text[i - 1]
+                pen += self._length(prev + ch) - self._length(ch)
+            mask, ox, oy = self.glyph(ch)
+            if mask.size:
+                placed.append((int(pen + 0.5) + ox, oy, mask))
+        return placed
+
+    def bbox(self, text):
+        # Entspricht draw.textbbox((0, 0), text) – Pillow zentriert danach, nicht nach der Tinte
+        b = self._bboxes.get(text)
+        if b is None:
+            b = self.font.getbbox(text)
+            with self._lock:
+                self._bboxes[text] = b
+        return b
+
+    def render(self, text):
+        # Liefert die eng zugeschnittene Alpha-Maske und ihre Lage relativ zum Textursprung
+        placed = self.layout(text)
+        if not placed:
+            return np.zeros((0, 0), np.uint8), (0, 0)
+        x0 = min(x for x, _, _ in placed)
+        y0 = min(y for _, y, _ in placed)
+        x1 = max(x + m.shape[1] for x, _, m in placed)
+        y1 = max(y + m.shape[0] for _, y, m in placed)
+        alpha = np.zeros((y1 - y0, x1 - x0), np.uint8)
+        for x, y, m in placed:
+            region = alpha[y - y0:y - y0 + m.shape[0], x - x0:x - x0 + m.shape[1]]
+            np.maximum(region, m, out=region)
+        return alpha, (x0, y0)
+
+@functools.lru_cache(maxsize=None)
+def glyph_cache(size, bold=False):
+    return GlyphCache(load_font(size, bold))
+
+# === Overlay zusammensetzen ===
+@functools.lru_cache(maxsize=None)
+def _pixel_lut(color):
+    # Alpha-Wert → fertiges RGBA-Pixel als uint32; Alpha 0 bleibt transparentes Weiß wie bei Pillow
+    lut = np.empty((256, 4), np.uint8)
+    lut[:, :3] = color
+    lut[:, 3] = np.arange(256)
+    lut[0] = (255, 255, 255, 0)
+    return lut.view(np.uint32)[:, 0]
+
+def text_overlay(text, width, height, size=55, bold=False, color=(0, 0, 0), canvas_height=None):
+    # canvas_height > height hängt unten transparente Zeilen an, ohne die Zentrierung zu ändern
+    glyphs = glyph_cache(size, bold)
+    alpha, (x0, y0) = glyphs.render(text)
+    h, w = alpha.shape
+    # Gleiche Zentrierung wie draw.text(((width - bw) // 2, (height - bh) // 2)) mit textbbox;
+    # die Tinte liegt dort um den Versatz (x0, y0) gegenüber dem Textursprung verschoben
+    bx0, by0, bx1, by1 = glyphs.bbox(text)
+    px, py = (width - (bx1 - bx0)) // 2 + x0, (height - (by1 - by0)) // 2 + y0
+
+    lut = _pixel_lut(tuple(color))
+    canvas = np.empty((canvas_height or height, width, 4), np.uint8)
+    pixels = canvas.view(np.uint32)[..., 0]
+    pixels.fill(lut[0])
+    # Auf die Leinwand zuschneiden, falls der Text breiter/höher ist
+    sx, sy = max(0, -px), max(0, -py)
+    ex, ey = min(w, width - px), min(h, (canvas_height or height) - py)
+    if sx < ex and sy < ey:
+        pixels[py + sy:py + ey, px + sx:px + ex] = lut[alpha[sy:ey, sx:ex]]
+    return canvas
+
+# === Schriftgröße an die Breite anpassen ===
+def fit_font_size(text, max_width, size, bold=False, min_size=10):
+    # Größte Größe ≤ size, bei der der Text in max_width passt – statt umzubrechen wie TextClip(method="caption")
+    while size > min_size:
+        x0, _, x1, _ = glyph_cache(size, bold).bbox(text)
+        if x1 - x0 <= max_width:
+            return size
+        # Breite wächst etwa linear mit der Größe: direkt in die Nähe springen, dann schrittweise
+        size = max(min_size, min(size - 1, int(size * max_width / (x1 - x0))))
+    return min_size
+
+def fitted_text_overlay(text, width, size=130, bold=True, color=(0, 0, 0), margin=0.05):
+    size = fit_font_size(text, int(width * (1 - 2 * margin)), size, bold)
+    # text_overlay zentriert wie Pillow: die Tinte beginnt bei 2·y0 und endet bei Höhe y1 + y0.
+    # Unten 2·y0 transparent anhängen, dann sitzt sie mittig wie bei TextClip(method="caption")
+    _, y0, _, y1 = glyph_cache(size, bold).bbox(text)
+    return text_overlay(text, width, y1 + y0, size=size, bold=bold, color=color, canvas_height=y1 + 3 * y0)